@@ -3,8 +3,9 @@
 import os
 import threading
 import logging
-from typing import Optional, Literal, cast
-from dataclasses import dataclass
+from functools import lru_cache
+from typing import Optional, Literal, Tuple, cast
+from dataclasses import dataclass, replace
 from dotenv import load_dotenv
 
 # Load environment variables from .env file
@@ -12,6 +13,50 @@ load_dotenv()
 
 logger = logging.getLogger(__name__)
 
+# Every environment variable read by Config.load_from_env; the values of these
+# keys form the cache key for parsed configurations.
+_CONFIG_ENV_KEYS: Tuple[str, ...] = (
+    "FASTAPI_HOST",
+    "FASTAPI_API_PORT",
+    "AUDIO_QUALITY",
+    "PREFETCH_THRESHOLD_SECONDS",
+    "CLIENT_CACHE_ENABLED",
+    "CLIENT_CACHE_MAX_ITEMS",
+    "CLIENT_CACHE_MAX_MB",
+    "TRANSCRIPTION_ENABLED",
+    "TRANSCRIPTION_PROVIDER",
+    "TRANSCRIPTION_MODEL",
+    "OPENAI_API_KEY",
+    "MISTRAL_API_KEY",
+    "TEMP_AUDIO_DIR",
+    "MAX_AUDIO_LENGTH_MINUTES",
+    "SUMMARY_PROVIDER",
+    "SUMMARY_MODEL",
+    "GEMINI_API_KEY",
+    "WEEKLY_SUMMARY_PROVIDER",
+    "WEEKLY_SUMMARY_MODEL",
+    "TRILIUM_URL",
+    "TRILIUM_ETAPI_TOKEN",
+    "TRILIUM_PARENT_NOTE_ID",
+    "BOOK_SUGGESTIONS_ENABLED",
+    "BOOKS_TO_ANALYZE",
+    "SUGGESTIONS_COUNT",
+    "SUGGESTIONS_AI_PROVIDER",
+    "SUGGESTIONS_MODEL",
+    "WEEKLY_SUMMARY_ENABLED",
+    "TTS_ENABLED",
+    "TTS_PROVIDER",
+    "OPENAI_TTS_VOICE",
+    "OPENAI_TTS_MODEL",
+    "ELEVENLABS_API_KEY",
+    "ELEVENLABS_VOICE_ID",
+    "ELEVENLABS_MODEL_ID",
+    "EDGE_TTS_VOICE",
+    "WEEKLY_SUMMARY_AUDIO_DIR",
+    "CLIENT_LOG_BATCH_INTERVAL",
+    "WIREGUARD_SUBNET",
+)
+
 
 def _parse_int(
     value: str,
@@ -126,7 +171,24 @@ class Config:
 
     @classmethod
     def load_from_env(cls) -> "Config":
-        """Load configuration from environment variables."""
+        """
+        Load configuration from environment variables.
+
+        Parsed configurations are cached per snapshot of the variables listed in
+        _CONFIG_ENV_KEYS, so repeated loads with an unchanged environment skip
+        re-parsing. Each call returns its own copy of the cached instance.
+        """
+        snapshot = tuple((key, os.environ.get(key)) for key in _CONFIG_ENV_KEYS)
+        return replace(_load_config_for_snapshot(snapshot))
+
+    @classmethod
+    def invalidate_cache(cls) -> None:
+        """Drop all cached configurations parsed by load_from_env."""
+        _load_config_for_snapshot.cache_clear()
+
+    @classmethod
+    def _parse_env(cls) -> "Config":
+        """Parse and validate configuration from the current environment."""
         transcription_enabled = (
             os.getenv("TRANSCRIPTION_ENABLED", "false").lower() == "true"
         )
@@ -396,6 +458,14 @@ class Config:
         return os.path.join(self.weekly_summary_audio_dir, f"{week_year}.mp3")
 
 
+@lru_cache(maxsize=32)
+def _load_config_for_snapshot(
+    snapshot: Tuple[Tuple[str, Optional[str]], ...],
+) -> Config:
+    """Parse configuration for one environment snapshot (used only as cache key)."""
+    return Config._parse_env()
+
+
 # Global config instance
 config: Optional[Config] = None
 _config_lock = threading.Lock()
@@ -15,6 +15,7 @@ from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 
 from config import get_config
+from services.api_clients import close_clients
 from services.audio_prefetch import init_audio_prefetcher, shutdown_audio_prefetcher
 from services.background_tasks import init_background_tasks
 from services.database import init_database
@@ -179,6 +180,13 @@ def shutdown_handler(signum=None, frame=None) -> None:
         except Exception as e:
             logger.warning(f"Error stopping scheduler: {e}")
 
+    # Close pooled HTTP connections (oEmbed, Trilium, LLM APIs) once nothing
+    # is left running that could still use them
+    try:
+        close_clients()
+    except Exception as e:
+        logger.warning(f"Error closing API clients: {e}")
+
     logger.info("Shutdown complete")
 
     # Exit the process if called by signal handler
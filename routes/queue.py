@@ -22,7 +22,7 @@ from services.database import (
     clear_queue,
     reorder_queue,
 )
-from services.youtube import get_video_metadata, extract_video_id
+from services.youtube import get_video_metadata, get_videos_metadata, extract_video_id
 from config import get_config
 
 logger = logging.getLogger(__name__)
@@ -252,10 +252,15 @@ def _run_suggestions_sync() -> dict:
     added = []
     failed = []
 
+    # One batched lookup for every suggestion instead of one per video
+    metadata_by_id = get_videos_metadata(
+        [s["video_id"] for s in suggestions if s.get("video_id")]
+    )
+
     for suggestion in suggestions:
         try:
             video_id = suggestion["video_id"]
-            metadata = get_video_metadata(video_id)
+            metadata = metadata_by_id.get(video_id)
 
             if metadata:
                 queue_id = add_to_queue(
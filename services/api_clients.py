@@ -2,7 +2,9 @@
 
 import threading
 import logging
-from typing import Optional
+from typing import Dict, Optional, Tuple
+from google import genai
+from google.genai.types import HttpOptions
 from openai import OpenAI
 import httpx
 
@@ -10,9 +12,14 @@ from config import get_config
 
 logger = logging.getLogger(__name__)
 
+# Long-running Gemini calls (audio transcription, large prompts): 10 minutes
+GEMINI_TIMEOUT = httpx.Timeout(600.0, connect=60.0)
+
 # Global client instances
 _openai_client: Optional[OpenAI] = None
 _httpx_client: Optional[httpx.Client] = None
+# Gemini SDK client and its underlying httpx client, per API key
+_gemini_clients: Dict[str, Tuple[genai.Client, httpx.Client]] = {}
 _client_lock = threading.Lock()
 
 
@@ -57,6 +64,29 @@ def get_httpx_client() -> httpx.Client:
     return _httpx_client
 
 
+def get_gemini_client(api_key: str) -> genai.Client:
+    """
+    Get the shared Gemini SDK client for an API key.
+
+    Creates one client per key, backed by an httpx client with GEMINI_TIMEOUT,
+    so repeated transcription and generation calls reuse its connection pool.
+    """
+    entry = _gemini_clients.get(api_key)
+    if entry is None:
+        with _client_lock:
+            entry = _gemini_clients.get(api_key)
+            if entry is None:
+                http_client = httpx.Client(timeout=GEMINI_TIMEOUT)
+                client = genai.Client(
+                    api_key=api_key,
+                    http_options=HttpOptions(httpx_client=http_client),
+                )
+                entry = (client, http_client)
+                _gemini_clients[api_key] = entry
+                logger.info("Initialized Gemini client with connection pooling")
+    return entry[0]
+
+
 def close_clients() -> None:
     """
     Close all client connections.
@@ -83,3 +113,13 @@ def close_clients() -> None:
                 logger.error(f"Error closing OpenAI client: {e}")
             finally:
                 _openai_client = None
+
+        for client, http_client in _gemini_clients.values():
+            try:
+                client.close()
+                # The SDK leaves custom httpx clients for the caller to close
+                http_client.close()
+                logger.info("Closed Gemini client")
+            except Exception as e:
+                logger.error(f"Error closing Gemini client: {e}")
+        _gemini_clients.clear()
@@ -4,6 +4,7 @@ import logging
 import threading
 import time
 import random
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from datetime import datetime, timedelta, timezone
 from enum import Enum
@@ -198,6 +199,13 @@ class TranscriptionWorker:
         self.queue = queue
         self.running = False
         self.thread: Optional[threading.Thread] = None
+        # Runs the Trilium dedup check while the audio download finishes
+        self._dedup_executor = self._new_dedup_executor()
+
+    @staticmethod
+    def _new_dedup_executor() -> ThreadPoolExecutor:
+        """Create the single-thread pool the Trilium dedup check runs on."""
+        return ThreadPoolExecutor(max_workers=1, thread_name_prefix="DedupCheck")
 
     def start(self) -> None:
         """Start the worker thread."""
@@ -206,6 +214,8 @@ class TranscriptionWorker:
             return
 
         self.running = True
+        # stop() shuts the pool down for good, so each start gets a fresh one
+        self._dedup_executor = self._new_dedup_executor()
         self.thread = threading.Thread(target=self._worker_loop, daemon=True)
         self.thread.start()
         logger.info("Transcription worker started")
@@ -216,6 +226,8 @@ class TranscriptionWorker:
         if self.thread:
             self.thread.join(timeout=5.0)
             logger.info("Transcription worker stopped")
+        # Don't wait on an in-flight Trilium request; drop any queued check
+        self._dedup_executor.shutdown(wait=False, cancel_futures=True)
 
     def _worker_loop(self) -> None:
         """Main worker loop."""
@@ -263,8 +275,16 @@ class TranscriptionWorker:
         cached_data = cache.get_cached(job.video_id)
 
         try:
+            # The dedup check only needs the video ID, so start it before waiting
+            # on the download instead of paying both latencies back to back
+            existing_note_future = self._dedup_executor.submit(
+                check_video_exists, job.video_id
+            )
+
             # Step 0: Wait for the audio file to be ready
             if not self._wait_for_file(job.audio_path, job.video_id):
+                # The result is no longer needed; skip the request if not started
+                existing_note_future.cancel()
                 self.queue.update_job_status(
                     job.video_id,
                     JobStatus.FAILED,
@@ -274,7 +294,7 @@ class TranscriptionWorker:
 
             # Step 1: Check if already exists in Trilium
             self.queue.update_job_status(job.video_id, JobStatus.CHECKING_DEDUP)
-            existing_note = check_video_exists(job.video_id)
+            existing_note = existing_note_future.result()
             if existing_note:
                 logger.info(
                     f"Video {job.video_id} already exists in Trilium: {existing_note['noteId']}"
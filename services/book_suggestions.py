@@ -6,8 +6,10 @@ Analyzes summaries from recent videos and suggests similar YouTube content.
 
 import logging
 import json
-import subprocess
-from typing import List, Dict, Optional
+import tempfile
+import threading
+from subprocess import PIPE, Popen as _popen, TimeoutExpired
+from typing import IO, List, Dict, FrozenSet, Optional, Tuple
 
 from config import get_config
 from services.llm_clients import get_tracked_openai_client, get_tracked_gemini_client
@@ -17,6 +19,13 @@ from services.models import VideoSummary, PlayHistoryItem
 logger = logging.getLogger(__name__)
 config = get_config()
 
+# How much play history to check suggestions against
+PLAYED_HISTORY_LIMIT = 1000
+
+# Fields read by _parse_video_json_line; yt-dlp prints just these per result
+SEARCH_PRINT_TEMPLATE = "%(.{id,title,uploader,duration})j"
+SEARCH_TIMEOUT_SECONDS = 30
+
 
 def _extract_text_from_html(html_content: str) -> str:
     """
@@ -90,19 +99,25 @@ def _fetch_summary_for_video(item: PlayHistoryItem) -> Optional[VideoSummary]:
     )
 
 
-def get_recent_summaries(limit: int) -> List[VideoSummary]:
+def get_recent_summaries(
+    limit: int, history: Optional[List[PlayHistoryItem]] = None
+) -> List[VideoSummary]:
     """
     Get summaries from recently watched videos (fetched from Trilium).
 
     Args:
         limit: Maximum number of summaries to fetch
+        history: Already-loaded play history (most recent first); queried if None
 
     Returns:
         List of VideoSummary objects
     """
     try:
         # Get recent history (get more to account for videos without summaries)
-        history = get_history(limit=limit * 2)
+        if history is None:
+            history = get_history(limit=limit * 2)
+        else:
+            history = history[: limit * 2]
 
         if not history:
             logger.warning("No history found")
@@ -254,9 +269,10 @@ def _parse_video_json_line(line: str) -> Optional[Dict[str, str]]:
     try:
         video_info = json.loads(line)
         video_id = video_info.get("id")
-        title = video_info.get("title", "")
-        channel = video_info.get("uploader", "Unknown")
-        duration = video_info.get("duration", 0)
+        # Fields yt-dlp could not extract may be missing or null
+        title = video_info.get("title") or ""
+        channel = video_info.get("uploader") or "Unknown"
+        duration = video_info.get("duration") or 0
 
         # Filter: must be at least 10 minutes (600 seconds)
         if duration < 600:
@@ -280,6 +296,10 @@ def search_youtube_by_theme(theme: str, count: int) -> List[Dict[str, str]]:
     """
     Search YouTube for videos matching the theme.
 
+    Results are read as yt-dlp prints them, and the search is stopped as soon
+    as enough long-form videos are found, so the remaining candidates are never
+    extracted.
+
     Args:
         theme: Search query theme
         count: Number of videos to find
@@ -296,66 +316,119 @@ def search_youtube_by_theme(theme: str, count: int) -> List[Dict[str, str]]:
         )
         logger.info(f"Searching YouTube for theme: {theme}")
         logger.debug(f"YT-DLP search URL: {search_url}")
-        result = subprocess.run(
-            [
-                YT_DLP_PATH,
-                "--dump-json",
-                "--no-playlist",
-                "--extractor-args",
-                "youtube:player_client=android",
-                search_url,
-            ],
-            capture_output=True,
-            text=True,
-            timeout=30,
-        )
 
-        if result.returncode != 0:
-            logger.warning(
-                f"YouTube search failed for theme '{theme}': {result.stderr}"
+        # stderr goes to a file so a chatty yt-dlp cannot fill a pipe we
+        # are not reading while we consume stdout
+        with tempfile.TemporaryFile(mode="w+") as stderr_file:
+            process = _popen(
+                [
+                    YT_DLP_PATH,
+                    "--print",
+                    SEARCH_PRINT_TEMPLATE,
+                    "--no-playlist",
+                    "--no-warnings",
+                    "--extractor-args",
+                    "youtube:player_client=android;skip=hls,dash",
+                    search_url,
+                ],
+                stdout=PIPE,
+                stderr=stderr_file,
+                text=True,
             )
-            return []
+            videos, timed_out = _read_search_results(process, count)
 
-        videos = []
-
-        # Parse each line of JSON output (one per video)
-        for line in result.stdout.strip().split("\n"):
-            video = _parse_video_json_line(line)
-            if video:
-                videos.append(video)
-
-                # Stop when we have enough
-                if len(videos) >= count:
-                    break
+            if timed_out and len(videos) < count:
+                logger.error(f"Timeout searching YouTube for theme '{theme}'")
+            elif not videos and process.returncode != 0:
+                stderr_file.seek(0)
+                logger.warning(
+                    f"YouTube search failed for theme '{theme}': {stderr_file.read()}"
+                )
+                return []
 
         logger.info(f"Found {len(videos)} videos for theme: {theme}")
         return videos
 
-    except subprocess.TimeoutExpired:
-        logger.error(f"Timeout searching YouTube for theme '{theme}'")
-        return []
     except Exception as e:
         logger.error(f"Error searching YouTube for theme '{theme}': {e}")
         return []
 
 
-def filter_already_played(videos: List[Dict[str, str]]) -> List[Dict[str, str]]:
+def _read_search_results(
+    process: "_popen[str]", count: int
+) -> Tuple[List[Dict[str, str]], bool]:
+    """
+    Collect videos from a running yt-dlp search until enough are found.
+
+    Args:
+        process: yt-dlp process printing one JSON object per line on stdout
+        count: Number of videos wanted
+
+    Returns:
+        Tuple of (videos found, whether SEARCH_TIMEOUT_SECONDS ran out). The
+        process has exited when this returns.
+    """
+    videos: List[Dict[str, str]] = []
+    # Timer.finished is only set after the callback returns, so the watchdog
+    # records the timeout itself before killing the process
+    killed_by_watchdog = threading.Event()
+
+    def _kill_on_timeout() -> None:
+        killed_by_watchdog.set()
+        process.kill()
+
+    watchdog = threading.Timer(SEARCH_TIMEOUT_SECONDS, _kill_on_timeout)
+    watchdog.start()
+    try:
+        stdout: IO[str] = process.stdout  # type: ignore[assignment]
+        for line in stdout:
+            video = _parse_video_json_line(line.strip())
+            if video:
+                videos.append(video)
+
+                # Stop when we have enough
+                if len(videos) >= count:
+                    break
+    finally:
+        watchdog.cancel()
+        timed_out = killed_by_watchdog.is_set()
+        if process.poll() is None:
+            process.terminate()
+        try:
+            process.wait(timeout=5)
+        except TimeoutExpired:
+            process.kill()
+            process.wait()
+        if process.stdout:
+            process.stdout.close()
+
+    return videos, timed_out
+
+
+def filter_already_played(
+    videos: List[Dict[str, str]], played_ids: Optional[FrozenSet[str]] = None
+) -> List[Dict[str, str]]:
     """
     Filter out videos that have already been played.
 
     Args:
         videos: List of video dicts with 'video_id' key
+        played_ids: Already-computed played YouTube IDs; queried if None
 
     Returns:
         Filtered list of videos
     """
+    # Nothing to filter, skip the history query
+    if not videos:
+        return []
+
     try:
-        # Get play history
-        history = get_history(limit=1000)  # Get more history to check against
-        played_video_ids = {item.youtube_id for item in history}
+        if played_ids is None:
+            history = get_history(limit=PLAYED_HISTORY_LIMIT)
+            played_ids = frozenset(item.youtube_id for item in history)
 
         # Filter out already played
-        filtered = [v for v in videos if v.get("video_id") not in played_video_ids]
+        filtered = [v for v in videos if v.get("video_id") not in played_ids]
 
         removed_count = len(videos) - len(filtered)
         if removed_count > 0:
@@ -368,6 +441,20 @@ def filter_already_played(videos: List[Dict[str, str]]) -> List[Dict[str, str]]:
         return videos  # Return unfiltered on error
 
 
+def _load_play_history() -> Optional[List[PlayHistoryItem]]:
+    """
+    Load play history once for the whole suggestion pipeline.
+
+    Returns:
+        List of PlayHistoryItem objects, or None if the query failed
+    """
+    try:
+        return get_history(limit=PLAYED_HISTORY_LIMIT)
+    except Exception as e:
+        logger.error(f"Error loading play history: {e}", exc_info=True)
+        return None
+
+
 def get_video_suggestions() -> List[Dict[str, str]]:
     """
     Get video suggestions based on recently watched content.
@@ -386,8 +473,14 @@ def get_video_suggestions() -> List[Dict[str, str]]:
         logger.warning("Video suggestions feature is disabled")
         return []
 
+    # Load history once; shared by summary lookup and played-video filtering
+    history = _load_play_history()
+    played_ids = (
+        frozenset(item.youtube_id for item in history) if history is not None else None
+    )
+
     # Step 1: Get recent summaries
-    summaries = get_recent_summaries(config.books_to_analyze)
+    summaries = get_recent_summaries(config.books_to_analyze, history=history)
 
     if not summaries:
         logger.warning("No summaries found from recent videos")
@@ -418,7 +511,7 @@ def get_video_suggestions() -> List[Dict[str, str]]:
         return []
 
     # Step 4: Filter out already played videos
-    filtered_videos = filter_already_played(videos)
+    filtered_videos = filter_already_played(videos, played_ids=played_ids)
 
     logger.info(f"Generated {len(filtered_videos)} new video suggestions")
     return filtered_videos
@@ -11,6 +11,7 @@ from services.models import (
     PlayHistoryItem,
     PlaybackPosition,
     QueueItem,
+    VideoMetadata,
     WeeklySummary,
     WeeklySummaryRun,
 )
@@ -236,6 +237,17 @@ def init_database():
             ON playback_positions (youtube_id)
         """)
 
+        # YouTube metadata fetched with yt-dlp, kept across restarts
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS video_metadata (
+                youtube_id TEXT PRIMARY KEY,
+                title TEXT NOT NULL,
+                channel TEXT,
+                thumbnail_url TEXT,
+                fetched_at TEXT NOT NULL
+            )
+        """)
+
         logger.info(f"Database initialized at {DB_PATH}")
 
 
@@ -1151,3 +1163,53 @@ def get_playback_positions_batch(youtube_ids: List[str]) -> Dict[str, PlaybackPo
         )
         rows = cursor.fetchall()
     return {row["youtube_id"]: PlaybackPosition.from_db_row(row) for row in rows}
+
+
+def save_video_metadata(metadata_by_id: Dict[str, dict]) -> None:
+    """
+    Save or update YouTube metadata for several videos in one transaction.
+
+    Args:
+        metadata_by_id: Video ID mapped to a dict with title, channel and thumbnail_url
+    """
+    if not metadata_by_id:
+        return
+    timestamp = datetime.now(timezone.utc).isoformat()
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.executemany(
+            """
+            INSERT INTO video_metadata (youtube_id, title, channel, thumbnail_url, fetched_at)
+            VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT(youtube_id) DO UPDATE SET
+                title = excluded.title,
+                channel = excluded.channel,
+                thumbnail_url = excluded.thumbnail_url,
+                fetched_at = excluded.fetched_at
+        """,
+            [
+                (
+                    youtube_id,
+                    metadata["title"],
+                    metadata.get("channel"),
+                    metadata.get("thumbnail_url"),
+                    timestamp,
+                )
+                for youtube_id, metadata in metadata_by_id.items()
+            ],
+        )
+
+
+def get_video_metadata_batch(youtube_ids: List[str]) -> Dict[str, VideoMetadata]:
+    """Get stored YouTube metadata for multiple video IDs in a single query."""
+    if not youtube_ids:
+        return {}
+    placeholders = ",".join("?" * len(youtube_ids))
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(
+            f"SELECT * FROM video_metadata WHERE youtube_id IN ({placeholders})",
+            youtube_ids,
+        )
+        rows = cursor.fetchall()
+    return {row["youtube_id"]: VideoMetadata.from_db_row(row) for row in rows}
@@ -11,13 +11,10 @@ import logging
 import time
 from typing import Optional, Any, Dict
 
-import httpx
-from google import genai
-from google.genai.types import HttpOptions
 from mistralai import Mistral
 
 from config import get_config
-from services.api_clients import get_openai_client
+from services.api_clients import get_gemini_client, get_openai_client
 from services.database import log_llm_usage
 
 logger = logging.getLogger(__name__)
@@ -98,12 +95,11 @@ class TrackedOpenAIClient:
         """
         try:
             # Make API call with configured model
-            response = self.client.audio.transcriptions.create(
+            # response_format="text" makes the SDK return the transcript as a str
+            transcript: str = self.client.audio.transcriptions.create(
                 model=self.whisper_model, file=audio_file, response_format="text"
             )
 
-            transcript = response if isinstance(response, str) else response.text
-
             # Track usage (Whisper doesn't return token counts)
             try:
                 tracking_metadata = metadata or {}
@@ -275,12 +271,12 @@ class TrackedGeminiClient:
             api_key: Gemini API key (optional, uses config if not provided)
         """
         self.config = get_config()
-        self.genai = genai
 
         # Get API key
-        self.api_key = api_key or self.config.gemini_api_key
-        if not self.api_key:
+        gemini_api_key = api_key or self.config.gemini_api_key
+        if not gemini_api_key:
             raise ValueError("Gemini API key not configured")
+        self.api_key: str = gemini_api_key
 
         # Model configurations - single source of truth
         self.transcription_model = (
@@ -312,12 +308,8 @@ class TrackedGeminiClient:
             Transcribed text
         """
         try:
-            # Configure longer timeout for audio transcription (10 minutes)
-            timeout_config = httpx.Timeout(600.0, connect=60.0)
-            httpx_client = httpx.Client(timeout=timeout_config)
-
-            http_options = HttpOptions(httpx_client=httpx_client)
-            client = self.genai.Client(api_key=self.api_key, http_options=http_options)
+            # Shared client with a long (10 minute) timeout for audio transcription
+            client = get_gemini_client(self.api_key)
 
             # Count tokens before transcription for accurate tracking
             audio_content = {
@@ -415,13 +407,8 @@ class TrackedGeminiClient:
             Gemini response object
         """
         try:
-            # Configure longer timeout for large prompts (e.g., long transcripts)
-            # Use httpx.Timeout for proper timeout configuration (10 minutes)
-            timeout_config = httpx.Timeout(600.0, connect=60.0)
-            httpx_client = httpx.Client(timeout=timeout_config)
-
-            http_options = HttpOptions(httpx_client=httpx_client)
-            client = self.genai.Client(api_key=self.api_key, http_options=http_options)
+            # Shared client with a long (10 minute) timeout for large prompts
+            client = get_gemini_client(self.api_key)
             model_to_use = model_override or self.chat_model
 
             # Log prompt size for debugging
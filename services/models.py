@@ -240,6 +240,28 @@ class PlaybackPosition:
         }
 
 
+@dataclass
+class VideoMetadata:
+    """Represents YouTube metadata stored so yt-dlp is not re-run after a restart."""
+
+    youtube_id: str
+    title: str
+    channel: Optional[str]
+    thumbnail_url: Optional[str]
+    fetched_at: str
+
+    @classmethod
+    def from_db_row(cls, row: Any) -> "VideoMetadata":
+        """Create instance from database row."""
+        return cls(
+            youtube_id=row["youtube_id"],
+            title=row["title"],
+            channel=row["channel"],
+            thumbnail_url=row["thumbnail_url"],
+            fetched_at=row["fetched_at"],
+        )
+
+
 @dataclass
 class BookInfo:
     """Represents book information for weekly summaries."""
@@ -12,6 +12,7 @@ from typing import Optional
 
 from services.cache import get_audio_cache
 from services.path_utils import expand_path, expand_path_str
+from services.youtube import YT_DLP_PATH
 from config import get_config
 
 logger = logging.getLogger(__name__)
@@ -106,7 +107,7 @@ def start_youtube_download(youtube_video_id: str):
     # --extract-audio handles the ffmpeg conversion internally.
     base_path = expand_path_str(os.path.join(config.temp_audio_dir, youtube_video_id))
     yt_cmd = [
-        "/usr/local/bin/yt-dlp",
+        YT_DLP_PATH,
         "-f",
         "bestaudio/best",
         "--extract-audio",
@@ -3,16 +3,14 @@
 import logging
 import os
 from pathlib import Path
+import random
 import subprocess
 import tempfile
 import time
 from typing import Optional
 
-import httpx
-from google import genai
-from google.genai.types import HttpOptions
-
 from config import get_config
+from services.api_clients import get_gemini_client
 from services.database import log_llm_usage
 from services.llm_clients import (
     get_tracked_openai_client,
@@ -30,6 +28,22 @@ GEMINI_INLINE_MAX_FILE_SIZE = (
     20 * 1024 * 1024
 )  # 20MB inline upload limit (use Files API for larger)
 
+# Retry backoff: exponential base delay plus up to 1s of jitter, capped
+RETRY_MAX_DELAY_SECONDS = 30.0
+
+
+def _retry_delay(attempt: int) -> float:
+    """
+    Compute the wait before retrying a failed transcription attempt.
+
+    Args:
+        attempt: Zero-based index of the attempt that just failed
+
+    Returns:
+        Delay in seconds: 2**attempt plus random jitter, capped at RETRY_MAX_DELAY_SECONDS
+    """
+    return min(RETRY_MAX_DELAY_SECONDS, 2**attempt + random.uniform(0, 1))
+
 
 def get_audio_duration(audio_path: str) -> float:
     """
@@ -293,9 +307,9 @@ def transcribe_audio_openai(audio_path: str, retries: int = 3) -> str:
                 logger.warning(f"Transcription attempt {attempt + 1} failed: {e}")
 
                 if attempt < retries - 1:
-                    # Exponential backoff
-                    wait_time = 2**attempt
-                    logger.info(f"Retrying in {wait_time} seconds...")
+                    # Exponential backoff with jitter
+                    wait_time = _retry_delay(attempt)
+                    logger.info(f"Retrying in {wait_time:.1f} seconds...")
                     time.sleep(wait_time)
                 else:
                     logger.error(
@@ -343,12 +357,8 @@ def _transcribe_gemini_with_files_api(
         f"Uploading audio file to Gemini Files API ({audio_file_size / 1024 / 1024:.2f}MB)"
     )
 
-    # Configure longer timeout for large file uploads and transcription (10 minutes)
-    timeout_config = httpx.Timeout(600.0, connect=60.0)
-    httpx_client = httpx.Client(timeout=timeout_config)
-
-    http_options = HttpOptions(httpx_client=httpx_client)
-    client = genai.Client(api_key=config.gemini_api_key, http_options=http_options)
+    # Shared client with a long (10 minute) timeout for large file uploads
+    client = get_gemini_client(config.gemini_api_key)
 
     # Upload file to Gemini Files API
     uploaded_file = client.files.upload(file=audio_path)
@@ -571,9 +581,9 @@ def transcribe_audio_gemini(audio_path: str, retries: int = 3) -> str:
             logger.warning(f"Gemini transcription attempt {attempt + 1} failed: {e}")
 
             if attempt < retries - 1:
-                # Exponential backoff
-                wait_time = 2**attempt
-                logger.info(f"Retrying in {wait_time} seconds...")
+                # Exponential backoff with jitter
+                wait_time = _retry_delay(attempt)
+                logger.info(f"Retrying in {wait_time:.1f} seconds...")
                 time.sleep(wait_time)
             else:
                 logger.error(f"All transcription attempts failed for {audio_path}")
@@ -682,9 +692,9 @@ def transcribe_audio_mistral(audio_path: str, retries: int = 3) -> str:
             logger.warning(f"Mistral transcription attempt {attempt + 1} failed: {e}")
 
             if attempt < retries - 1:
-                # Exponential backoff
-                wait_time = 2**attempt
-                logger.info(f"Retrying in {wait_time} seconds...")
+                # Exponential backoff with jitter
+                wait_time = _retry_delay(attempt)
+                logger.info(f"Retrying in {wait_time:.1f} seconds...")
                 time.sleep(wait_time)
             else:
                 logger.error(f"All transcription attempts failed for {audio_path}")
@@ -3,22 +3,57 @@
 import logging
 import json
 import os
-from typing import Optional, Dict, Union
+import re
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Optional, Dict, List, Tuple, Union
 import httpx
 
 from config import get_config
 from services.database import get_video_title_from_history
 from services.api_clients import get_httpx_client
-from services.path_utils import expand_path_str
+from services.path_utils import expand_path
 
 logger = logging.getLogger(__name__)
 
+# Inline markdown patterns, compiled once
+_BOLD_RE = re.compile(r"\*\*(.+?)\*\*")
+_ITALIC_RE = re.compile(r"\*(.+?)\*")
+
+# Header prefixes and their tags, longest prefix first
+_HEADER_PREFIXES = (("### ", "h3"), ("## ", "h2"), ("# ", "h1"))
+
+# HTML escapes applied in a single pass by _escape_text
+_ESCAPE_TABLE = str.maketrans(
+    {
+        "&": "&amp;",
+        "<": "&lt;",
+        ">": "&gt;",
+        '"': "&quot;",
+        "'": "&#39;",
+    }
+)
+
+# Local fallback location for notes and attachments that fail to upload
+_BACKUP_DIR = "/tmp/trilium-backup"
+
+# Last search result per video ID, keyed for If-None-Match revalidation;
+# least recently used first
+ETAG_CACHE_SIZE = 512
+_etag_cache: "OrderedDict[str, Tuple[str, Optional[Dict[str, str]]]]" = OrderedDict()
+_etag_cache_lock = threading.Lock()
+
 
 def _build_url(base_url: Union[str, None], path: str) -> str:
     """Build a URL by joining base and path, handling trailing/leading slashes."""
-    base = base_url.rstrip("/") if base_url else ""
-    path = path.lstrip("/")
-    return f"{base}/{path}"
+    if not base_url:
+        base_url = ""
+    elif base_url.endswith("/"):
+        base_url = base_url.rstrip("/")
+    if path.startswith("/"):
+        path = path.lstrip("/")
+    return f"{base_url}/{path}"
 
 
 def _get_trilium_headers(content_type: str = "application/json") -> Dict[str, str]:
@@ -78,42 +113,28 @@ def check_video_exists(video_id: str) -> Optional[Dict[str, str]]:
 
         # Try to search using query parameter
         params = {"search": search_query}
+        headers = _get_trilium_headers()
+        with _etag_cache_lock:
+            cached = _etag_cache.get(video_id)
+            if cached:
+                _etag_cache.move_to_end(video_id)
+        if cached:
+            headers["If-None-Match"] = cached[0]
+
         client = get_httpx_client()
-        response = client.get(
-            url, headers=_get_trilium_headers(), params=params, timeout=10.0
-        )
+        response = client.get(url, headers=headers, params=params, timeout=10.0)
+        if cached and response.status_code == 304:
+            logger.debug(f"Search results unchanged for video {video_id} (ETag hit)")
+            return cached[1]
         response.raise_for_status()
 
         results = response.json()
+        result = _first_note_from_search(video_id, results)
 
-        # The search endpoint returns a list directly (or might have "results" key)
-        # Handle both possible response formats
-        if isinstance(results, dict) and "results" in results:
-            # Response is {"results": [...]}
-            note_list = results.get("results", [])
-        elif isinstance(results, list):
-            # Response is directly a list
-            note_list = results
-        else:
-            logger.warning(f"Unexpected search response format: {type(results)}")
-            note_list = []
-
-        if note_list and len(note_list) > 0:
-            # Get the first result
-            first_note = note_list[0]
-            note_id = first_note.get("noteId")
-
-            if not note_id:
-                logger.warning(
-                    f"Found search result but no noteId in response: {first_note}"
-                )
-                return None
-
-            logger.info(f"Found existing note for video {video_id}: {note_id}")
-            return {"noteId": note_id, "url": _get_trilium_note_url(note_id)}
-
-        logger.info(f"No existing note found for video {video_id}")
-        return None
+        etag = response.headers.get("ETag")
+        if etag:
+            _cache_search_result(video_id, etag, result)
+        return result
 
     except Exception as e:
         logger.warning(
@@ -123,6 +144,60 @@ def check_video_exists(video_id: str) -> Optional[Dict[str, str]]:
         return None
 
 
+def _cache_search_result(
+    video_id: str, etag: str, result: Optional[Dict[str, str]]
+) -> None:
+    """Remember a search result by ETag, evicting the least recently used entry."""
+    with _etag_cache_lock:
+        _etag_cache[video_id] = (etag, result)
+        _etag_cache.move_to_end(video_id)
+        if len(_etag_cache) > ETAG_CACHE_SIZE:
+            _etag_cache.popitem(last=False)
+
+
+def _first_note_from_search(
+    video_id: str, results: Union[Dict, List]
+) -> Optional[Dict[str, str]]:
+    """
+    Extract the first matching note from a Trilium search response.
+
+    Args:
+        video_id: The YouTube video ID that was searched for
+        results: Parsed JSON body of the search response
+
+    Returns:
+        Dict with noteId and url if a note was found, None otherwise
+    """
+    # The search endpoint returns a list directly (or might have "results" key)
+    # Handle both possible response formats
+    if isinstance(results, dict) and "results" in results:
+        # Response is {"results": [...]}
+        note_list = results.get("results", [])
+    elif isinstance(results, list):
+        # Response is directly a list
+        note_list = results
+    else:
+        logger.warning(f"Unexpected search response format: {type(results)}")
+        note_list = []
+
+    if note_list and len(note_list) > 0:
+        # Get the first result
+        first_note = note_list[0]
+        note_id = first_note.get("noteId")
+
+        if not note_id:
+            logger.warning(
+                f"Found search result but no noteId in response: {first_note}"
+            )
+            return None
+
+        logger.info(f"Found existing note for video {video_id}: {note_id}")
+        return {"noteId": note_id, "url": _get_trilium_note_url(note_id)}
+
+    logger.info(f"No existing note found for video {video_id}")
+    return None
+
+
 def create_trilium_note(video_id: str, transcript: str, summary: str) -> Dict[str, str]:
     """
     Create a new note in Trilium with the summary and youtube_id attribute.
@@ -190,6 +265,10 @@ def create_trilium_note(video_id: str, transcript: str, summary: str) -> Dict[st
             raise Exception(f"Failed to get note ID from response: {result}")
 
         logger.info(f"Created Trilium note: {note_id}")
+        # A cached "no note" answer for this video is now wrong; search again
+        # next time instead of trusting the server to change its ETag
+        with _etag_cache_lock:
+            _etag_cache.pop(video_id, None)
 
         # Step 2: Add the youtube_id attribute to the note
         attribute_payload = {
@@ -234,64 +313,56 @@ def create_trilium_note(video_id: str, transcript: str, summary: str) -> Dict[st
         raise
 
 
+@lru_cache(maxsize=128)
 def _markdown_to_html(text: str) -> str:
     """
     Convert basic markdown formatting to HTML.
 
+    Results are memoized, so re-rendering the same summary (retries, backups)
+    is a dictionary lookup.
+
     Handles:
     - ### Headers
     - **bold**
     - Bullet points (-, *)
     - Line breaks
     """
-    lines = text.split("\n")
-    html_lines = []
-    in_list = False
+    # Plain prose has no headers, bullets or emphasis: one paragraph per line
+    if "*" not in text and "#" not in text and "-" not in text:
+        return "\n".join(
+            f"<p>{line}</p>" if line else "<br>"
+            for line in (raw.strip() for raw in _escape_text(text).split("\n"))
+        )
 
-    for line in lines:
-        line = line.strip()
+    html_lines: List[str] = []
+    in_list = False
 
-        if not line:
-            if in_list:
-                html_lines.append("</ul>")
-                in_list = False
-            html_lines.append("<br>")
-            continue
+    for raw_line in text.split("\n"):
+        line = raw_line.strip()
 
-        # Handle headers (###, ##, #)
-        if line.startswith("### "):
-            if in_list:
-                html_lines.append("</ul>")
-                in_list = False
-            html_lines.append(f"<h3>{_escape_text(line[4:])}</h3>")
-        elif line.startswith("## "):
-            if in_list:
-                html_lines.append("</ul>")
-                in_list = False
-            html_lines.append(f"<h2>{_escape_text(line[3:])}</h2>")
-        elif line.startswith("# "):
-            if in_list:
-                html_lines.append("</ul>")
-                in_list = False
-            html_lines.append(f"<h1>{_escape_text(line[2:])}</h1>")
-
-        # Handle bullet points
-        elif line.startswith("- ") or line.startswith("* "):
+        # Bullet points open (or continue) a list
+        if line.startswith(("- ", "* ")):
             if not in_list:
                 html_lines.append("<ul>")
                 in_list = True
-            content = line[2:].strip()
-            # Handle bold within list items
-            content = _process_inline_formatting(content)
+            content = _process_inline_formatting(line[2:].strip())
             html_lines.append(f"<li>{content}</li>")
+            continue
+
+        # Any other line closes an open list
+        if in_list:
+            html_lines.append("</ul>")
+            in_list = False
 
-        # Regular paragraph
+        if not line:
+            html_lines.append("<br>")
+            continue
+
+        header = _render_header(line) if line[0] == "#" else None
+        if header is not None:
+            html_lines.append(header)
         else:
-            if in_list:
-                html_lines.append("</ul>")
-                in_list = False
-            content = _process_inline_formatting(line)
-            html_lines.append(f"<p>{content}</p>")
+            html_lines.append(f"<p>{_process_inline_formatting(line)}</p>")
 
     # Close any open list
     if in_list:
@@ -300,31 +371,37 @@ def _markdown_to_html(text: str) -> str:
     return "\n".join(html_lines)
 
 
+def _render_header(line: str) -> Optional[str]:
+    """Render a #, ## or ### header line, or return None if it is not a header."""
+    for prefix, tag in _HEADER_PREFIXES:
+        if line.startswith(prefix):
+            return f"<{tag}>{_escape_text(line[len(prefix) :])}</{tag}>"
+    return None
+
+
 def _process_inline_formatting(text: str) -> str:
     """Process inline formatting like **bold**."""
-    import re
-
     # Escape HTML first
     text = _escape_text(text)
 
-    # Handle **bold**
-    text = re.sub(r"\*\*(.+?)\*\*", r"<strong>\1</strong>", text)
+    # No asterisks means no bold or italic to convert
+    if "*" not in text:
+        return text
 
-    # Handle *italic*
-    text = re.sub(r"\*(.+?)\*", r"<em>\1</em>", text)
+    # Handle **bold** (only when a double marker is present)
+    if "**" in text:
+        text = _BOLD_RE.sub(r"<strong>\g<1></strong>", text)
+
+    # Handle *italic* with whatever single markers the bold pass left
+    if "*" in text:
+        text = _ITALIC_RE.sub(r"<em>\g<1></em>", text)
 
     return text
 
 
 def _escape_text(text: str) -> str:
     """Escape HTML special characters in text."""
-    return (
-        text.replace("&", "&amp;")
-        .replace("<", "&lt;")
-        .replace(">", "&gt;")
-        .replace('"', "&quot;")
-        .replace("'", "&#39;")
-    )
+    return text.translate(_ESCAPE_TABLE)
 
 
 def get_note_content(note_id: str) -> Optional[str]:
@@ -410,37 +487,43 @@ def attach_audio_to_note(
 
         logger.info(f"Created file note: {file_note_id}")
 
-        # Step 2: Upload the file content using a direct HTTP client
-        with open(expand_path_str(audio_file_path), "rb") as f:
-            audio_data = f.read()
-
-        file_size_mb = len(audio_data) / (1024 * 1024)
-        logger.info(
-            f"Uploading {file_size_mb:.2f} MB audio file to note {file_note_id}"
-        )
-        logger.info(f"Audio data size: {len(audio_data)} bytes")
-
+        # Step 2: Stream the file content from disk using a direct HTTP client
         content_url = _build_url(
             config.trilium_url, f"etapi/notes/{file_note_id}/content"
         )
 
-        # Use a fresh httpx client for the content upload
-        try:
-            # Create a fresh client for this request to avoid connection pooling issues
-            with httpx.Client(timeout=120.0) as upload_client:
-                content_response = upload_client.put(
-                    content_url,
-                    headers=_get_trilium_headers("application/octet-stream"),
-                    content=audio_data,  # Use content for raw binary
-                )
-                content_response.raise_for_status()
-        except Exception:
-            # Log the full response for debugging
-            logger.error(
-                f"Failed to upload content. Status: {content_response.status_code}"
+        with open(expand_path(audio_file_path), "rb") as audio_file:
+            # Size the open handle, so the length matches the bytes streamed
+            # even if the cached file is replaced after we opened it
+            file_size = os.fstat(audio_file.fileno()).st_size
+
+            file_size_mb = file_size / (1024 * 1024)
+            logger.info(
+                f"Uploading {file_size_mb:.2f} MB audio file to note {file_note_id}"
             )
-            logger.error(f"Response body: {content_response.text[:500]}")
-            raise
+            logger.info(f"Audio data size: {file_size} bytes")
+
+            # Explicit length so the streamed body is not sent with chunked encoding
+            upload_headers = _get_trilium_headers("application/octet-stream")
+            upload_headers["Content-Length"] = str(file_size)
+
+            # Use a fresh httpx client for the content upload
+            try:
+                # Create a fresh client for this request to avoid connection pooling issues
+                with httpx.Client(timeout=120.0) as upload_client:
+                    content_response = upload_client.put(
+                        content_url,
+                        headers=upload_headers,
+                        content=audio_file,  # httpx reads the file in chunks
+                    )
+                    content_response.raise_for_status()
+            except Exception:
+                # Log the full response for debugging
+                logger.error(
+                    f"Failed to upload content. Status: {content_response.status_code}"
+                )
+                logger.error(f"Response body: {content_response.text[:500]}")
+                raise
 
         logger.info(
             f"Successfully attached audio to note {note_id} as child note {file_note_id}"
@@ -451,9 +534,7 @@ def attach_audio_to_note(
         logger.error(f"Error attaching audio to note {note_id}: {e}")
         # Save backup
         try:
-            backup_dir = "/tmp/trilium-backup"
-            os.makedirs(backup_dir, exist_ok=True)
-            backup_file = os.path.join(backup_dir, f"{note_id}_audio.txt")
+            backup_file = os.path.join(_ensure_backup_dir(), f"{note_id}_audio.txt")
             with open(backup_file, "w") as f:
                 f.write(f"Failed to attach: {audio_file_path}\nError: {e}\n")
             logger.info(f"Saved attachment failure info to {backup_file}")
@@ -462,13 +543,21 @@ def attach_audio_to_note(
         raise
 
 
+def _ensure_backup_dir() -> str:
+    """
+    Create the local backup directory if needed and return its path.
+
+    Checked on every backup rather than once per process: tmp cleaners may
+    remove it while the server runs, and backups are only written on failures.
+    """
+    os.makedirs(_BACKUP_DIR, exist_ok=True)
+    return _BACKUP_DIR
+
+
 def _save_to_backup(video_id: str, transcript: str, summary: str) -> None:
     """Save transcript and summary to local backup file."""
     try:
-        backup_dir = "/tmp/trilium-backup"
-        os.makedirs(backup_dir, exist_ok=True)
-
-        backup_file = os.path.join(backup_dir, f"{video_id}.json")
+        backup_file = os.path.join(_ensure_backup_dir(), f"{video_id}.json")
 
         data = {
             "video_id": video_id,
@@ -477,8 +566,9 @@ def _save_to_backup(video_id: str, transcript: str, summary: str) -> None:
             "youtube_url": f"https://www.youtube.com/watch?v={video_id}",
         }
 
-        with open(backup_file, "w") as f:
-            json.dump(data, f, indent=2)
+        # Keep non-ASCII transcripts as UTF-8 rather than \uXXXX escapes
+        with open(backup_file, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2, ensure_ascii=False)
 
         logger.info(f"Saved backup to {backup_file}")
 
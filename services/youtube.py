@@ -1,16 +1,101 @@
 import subprocess
 import json
 import logging
-from typing import Optional
+import os
+import re
+import shutil
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import Dict, List, Optional
+from urllib.parse import parse_qs, urlparse
+
+from services.api_clients import get_httpx_client
+from services.database import get_video_metadata_batch, save_video_metadata
 
 logger = logging.getLogger(__name__)
 
-YT_DLP_PATH = "/usr/local/bin/yt-dlp"
+DEFAULT_YT_DLP_PATH = "/usr/local/bin/yt-dlp"
+
+
+def _resolve_yt_dlp_path() -> str:
+    """
+    Locate the yt-dlp binary once, at import.
+
+    The standalone release in /usr/local/bin is preferred (it is the one the
+    README installs and keeps updated); otherwise the first yt-dlp on PATH is
+    used.
+    """
+    if os.path.isfile(DEFAULT_YT_DLP_PATH):
+        return DEFAULT_YT_DLP_PATH
+    found = shutil.which("yt-dlp")
+    if found:
+        logger.info(f"Using yt-dlp from PATH: {found}")
+        return found
+    logger.warning(
+        f"yt-dlp not found at {DEFAULT_YT_DLP_PATH} or on PATH; "
+        "metadata lookups and downloads will fail"
+    )
+    return DEFAULT_YT_DLP_PATH
+
+
+YT_DLP_PATH = _resolve_yt_dlp_path()
+
+# Print only the fields we read, as one JSON object, instead of --dump-json
+METADATA_PRINT_TEMPLATE = "%(.{id,title,channel,uploader,creator})j"
+METADATA_SOCKET_TIMEOUT_SECONDS = 3
+# A single lookup that stalls is usually one bad network hop: give up on the
+# process quickly and start a fresh one instead of waiting out a long timeout.
+# Each attempt leaves room for yt-dlp's interpreter start-up.
+METADATA_TIMEOUT_SECONDS = 6
+METADATA_ATTEMPTS = 2
+
+# Public oEmbed endpoint: title and channel in one small HTTPS request, tried
+# before yt-dlp, which is only needed for videos oEmbed refuses (private,
+# age-restricted, embedding disabled)
+OEMBED_URL = "https://www.youtube.com/oembed"
+OEMBED_TIMEOUT_SECONDS = 5
+
+# Canonical watch (v= first), youtu.be, embed and /v/ URLs with a standard
+# 11-character ID; anything else goes through urlparse in extract_video_id
+_CANONICAL_VIDEO_URL_RE = re.compile(
+    r"https?://(?:"
+    r"(?:www\.|m\.)?youtube\.com/watch\?v=([A-Za-z0-9_-]{11})(?=$|[&#])"
+    r"|(?:(?:www\.|m\.)?youtube\.com/(?:embed|v)/|youtu\.be/)"
+    r"([A-Za-z0-9_-]{11})(?=$|[?#])"
+    r")"
+)
+
+# First non-empty v= parameter of a watch URL query, as parse_qs would pick it
+_WATCH_QUERY_V_RE = re.compile(r"(?:^|&)v=([^&]+)")
+
+# Every YouTube video ID is 11 characters from this set; anything else cannot
+# resolve, so it is rejected before any HTTP request or yt-dlp process
+_VIDEO_ID_RE = re.compile(r"[A-Za-z0-9_-]{11}")
+
+# Successful metadata lookups, most recently used last
+METADATA_CACHE_SIZE = 2048
+# yt-dlp extracts the videos it is given one after another, so a batch is split
+# across this many processes running side by side
+METADATA_BATCH_WORKERS = 4
+_metadata_cache: "OrderedDict[str, dict]" = OrderedDict()
+_metadata_cache_lock = threading.Lock()
+# Lookups currently in progress; concurrent callers for the same video wait on these
+_metadata_inflight: Dict[str, "Future[Optional[dict]]"] = {}
+# How long a concurrent caller waits on someone else's lookup before giving up
+METADATA_INFLIGHT_WAIT_SECONDS = 20
 
 
 def get_video_metadata(youtube_id: str) -> Optional[dict]:
     """
-    Fetch metadata for a YouTube video using yt-dlp.
+    Fetch metadata for a YouTube video using oEmbed, or yt-dlp if that fails.
+
+    Successful lookups are kept in an in-memory LRU cache, so replaying a video
+    does not run yt-dlp again, and in the database, so a restart does not
+    either. Failures are not cached and are retried.
+    Concurrent lookups for the same video share a single run; a caller waiting
+    on another's lookup gives up after METADATA_INFLIGHT_WAIT_SECONDS.
 
     Args:
         youtube_id: YouTube video ID
@@ -18,61 +103,308 @@ def get_video_metadata(youtube_id: str) -> Optional[dict]:
     Returns:
         Dictionary with title, channel, and thumbnail_url if successful, None otherwise
     """
+    if not _VIDEO_ID_RE.fullmatch(youtube_id):
+        logger.warning(f"Skipping metadata lookup for invalid video ID: {youtube_id!r}")
+        return None
+
+    with _metadata_cache_lock:
+        cached = _metadata_cache.get(youtube_id)
+        if cached is not None:
+            _metadata_cache.move_to_end(youtube_id)
+            return dict(cached)
+
+        pending = _metadata_inflight.get(youtube_id)
+        if pending is None:
+            lookup: "Future[Optional[dict]]" = Future()
+            _metadata_inflight[youtube_id] = lookup
+
+    if pending is not None:
+        # Another request is already looking this video up
+        try:
+            shared = pending.result(timeout=METADATA_INFLIGHT_WAIT_SECONDS)
+        except FutureTimeoutError:
+            logger.warning(f"Timed out waiting on metadata lookup for {youtube_id}")
+            return None
+        return dict(shared) if shared is not None else None
+
+    metadata = None
     try:
-        url = f"https://www.youtube.com/watch?v={youtube_id}"
+        metadata = _load_stored_metadata([youtube_id]).get(youtube_id)
+        if metadata is None:
+            metadata = _fetch_oembed_metadata(youtube_id) or _fetch_video_metadata(
+                youtube_id
+            )
+            if metadata is not None:
+                _store_metadata({youtube_id: metadata})
+    finally:
+        if metadata is not None:
+            _cache_metadata(youtube_id, metadata)
+        with _metadata_cache_lock:
+            del _metadata_inflight[youtube_id]
+        lookup.set_result(metadata)
+
+    return dict(metadata) if metadata is not None else None
 
-        # Use yt-dlp to get video info without downloading
-        # Use android player client to avoid JS runtime requirement
+
+def clear_metadata_cache() -> None:
+    """Drop all cached video metadata."""
+    with _metadata_cache_lock:
+        _metadata_cache.clear()
+
+
+def get_videos_metadata(youtube_ids: List[str]) -> Dict[str, dict]:
+    """
+    Fetch metadata for several YouTube videos at once.
+
+    Cached videos are served from memory or the database. The rest are looked
+    up through oEmbed in parallel; whatever oEmbed cannot answer is split across
+    up to METADATA_BATCH_WORKERS yt-dlp processes run side by side, so the
+    interpreter startup is paid once per chunk and the network waits overlap.
+    Results are added to the caches used by get_video_metadata.
+
+    Args:
+        youtube_ids: YouTube video IDs
+
+    Returns:
+        Dictionary mapping each video ID that was found to its metadata. Videos
+        that failed are left out, so callers can fall back to get_video_metadata.
+    """
+    found: Dict[str, dict] = {}
+    missing: List[str] = []
+    with _metadata_cache_lock:
+        for youtube_id in dict.fromkeys(youtube_ids):
+            if not _VIDEO_ID_RE.fullmatch(youtube_id):
+                logger.warning(
+                    f"Skipping metadata lookup for invalid video ID: {youtube_id!r}"
+                )
+                continue
+            cached = _metadata_cache.get(youtube_id)
+            if cached is not None:
+                _metadata_cache.move_to_end(youtube_id)
+                found[youtube_id] = dict(cached)
+            else:
+                missing.append(youtube_id)
+
+    if not missing:
+        return found
+
+    stored = _load_stored_metadata(missing)
+    for youtube_id, metadata in stored.items():
+        _cache_metadata(youtube_id, metadata)
+        found[youtube_id] = dict(metadata)
+    missing = [youtube_id for youtube_id in missing if youtube_id not in stored]
+    if not missing:
+        return found
+
+    fetched: Dict[str, dict] = {}
+    with ThreadPoolExecutor(
+        max_workers=min(METADATA_BATCH_WORKERS, len(missing)),
+        thread_name_prefix="MetadataBatch",
+    ) as executor:
+        for youtube_id, oembed_metadata in zip(
+            missing, executor.map(_fetch_oembed_metadata, missing)
+        ):
+            if oembed_metadata is not None:
+                fetched[youtube_id] = oembed_metadata
+
+        remaining = [youtube_id for youtube_id in missing if youtube_id not in fetched]
+        if remaining:
+            workers = min(METADATA_BATCH_WORKERS, len(remaining))
+            chunks = [remaining[i::workers] for i in range(workers)]
+            for batch in executor.map(_fetch_metadata_batch, chunks):
+                fetched.update(batch)
+
+    for youtube_id, metadata in fetched.items():
+        _cache_metadata(youtube_id, metadata)
+        found[youtube_id] = dict(metadata)
+    _store_metadata(fetched)
+
+    failed = len(missing) - len(fetched)
+    if failed:
+        logger.warning(
+            f"Could not fetch metadata for {failed} of {len(missing)} videos"
+        )
+    return found
+
+
+def _fetch_metadata_batch(youtube_ids: List[str]) -> Dict[str, dict]:
+    """
+    Run one yt-dlp process for a chunk of a batch.
+
+    Args:
+        youtube_ids: Uncached YouTube video IDs, without duplicates
+
+    Returns:
+        Dictionary mapping each video ID that was found to its metadata
+    """
+    found: Dict[str, dict] = {}
+    try:
+        # --ignore-errors keeps going past unavailable videos; the exit code is
+        # then non-zero, but every video that worked is still printed. Missing
+        # videos are counted by the caller, so stderr is never read here.
         result = subprocess.run(
-            [
-                YT_DLP_PATH,
-                "--dump-json",
-                "--no-playlist",
-                "--extractor-args",
-                "youtube:player_client=android",
-                url,
-            ],
-            capture_output=True,
-            text=True,
-            timeout=10,
+            _metadata_command(youtube_ids, "--ignore-errors"),
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            timeout=10 * len(youtube_ids),
         )
+    except subprocess.TimeoutExpired:
+        logger.error(f"Timeout fetching metadata for {len(youtube_ids)} videos")
+        return found
+    except Exception as e:
+        logger.error(f"Error fetching metadata for {len(youtube_ids)} videos: {e}")
+        return found
 
-        if result.returncode == 0:
-            video_info = json.loads(result.stdout)
+    wanted = set(youtube_ids)
+    # json.loads decodes the raw bytes itself; invalid UTF-8 is a ValueError too
+    for line in result.stdout.splitlines():
+        try:
+            video_info = json.loads(line)
+        except ValueError:
+            continue
+        youtube_id = video_info.get("id") if isinstance(video_info, dict) else None
+        if youtube_id not in wanted:
+            continue
+        found[youtube_id] = _metadata_from_info(youtube_id, video_info)
+    return found
 
-            # Extract title
-            title = video_info.get("title", "Unknown Title")
 
-            # Extract channel name (try multiple fields)
-            channel = (
-                video_info.get("channel")
-                or video_info.get("uploader")
-                or video_info.get("creator")
-                or "Unknown Channel"
-            )
+def _load_stored_metadata(youtube_ids: List[str]) -> Dict[str, dict]:
+    """Read metadata saved by an earlier lookup, treating database errors as misses."""
+    try:
+        stored = get_video_metadata_batch(youtube_ids)
+    except Exception as e:
+        logger.warning(f"Could not read stored video metadata: {e}")
+        return {}
+    return {
+        youtube_id: {
+            "title": row.title,
+            "channel": row.channel,
+            "thumbnail_url": row.thumbnail_url,
+        }
+        for youtube_id, row in stored.items()
+    }
+
+
+def _store_metadata(metadata_by_id: Dict[str, dict]) -> None:
+    """Save fetched metadata so it survives a restart; failures are only logged."""
+    try:
+        save_video_metadata(metadata_by_id)
+    except Exception as e:
+        logger.warning(f"Could not store video metadata: {e}")
+
+
+def _cache_metadata(youtube_id: str, metadata: dict) -> None:
+    """Store a successful lookup, evicting the least recently used entry."""
+    with _metadata_cache_lock:
+        _metadata_cache[youtube_id] = metadata
+        _metadata_cache.move_to_end(youtube_id)
+        if len(_metadata_cache) > METADATA_CACHE_SIZE:
+            _metadata_cache.popitem(last=False)
+
+
+def _metadata_command(youtube_ids: List[str], *options: str) -> List[str]:
+    """Build the yt-dlp command that prints metadata for the given videos."""
+    # Use yt-dlp to get video info without downloading (--print implies it)
+    # Use android player client to avoid JS runtime requirement, and skip
+    # the HLS/DASH manifest requests that only matter for format selection
+    return [
+        YT_DLP_PATH,
+        "--print",
+        METADATA_PRINT_TEMPLATE,
+        "--no-playlist",
+        "--extractor-args",
+        "youtube:player_client=android;skip=hls,dash",
+        # Fail a stalled request well inside our own subprocess timeout
+        "--socket-timeout",
+        str(METADATA_SOCKET_TIMEOUT_SECONDS),
+        # One extractor retry instead of yt-dlp's default three
+        "--extractor-retries",
+        "1",
+        # Errors are still reported; only the warnings nobody reads are dropped
+        "--no-warnings",
+        *options,
+        *(
+            f"https://www.youtube.com/watch?v={youtube_id}"
+            for youtube_id in youtube_ids
+        ),
+    ]
+
+
+def _metadata_from_info(youtube_id: str, video_info: dict) -> dict:
+    """Build our metadata dict (title, channel, thumbnail_url) from yt-dlp output."""
+    # Extract title
+    title = video_info.get("title") or "Unknown Title"
+
+    # Extract channel name (try multiple fields)
+    channel = (
+        video_info.get("channel")
+        or video_info.get("uploader")
+        or video_info.get("creator")
+        or "Unknown Channel"
+    )
+
+    # YouTube thumbnail URL
+    # Use standard YouTube thumbnail URLs (always available)
+    # Try maxresdefault (1280x720) first, but it's not always available
+    # More reliable: hqdefault (480x360) or sddefault (640x480)
+    thumbnail_url = f"https://i.ytimg.com/vi/{youtube_id}/hqdefault.jpg"
 
-            # YouTube thumbnail URL
-            # Use standard YouTube thumbnail URLs (always available)
-            # Try maxresdefault (1280x720) first, but it's not always available
-            # More reliable: hqdefault (480x360) or sddefault (640x480)
-            thumbnail_url = f"https://i.ytimg.com/vi/{youtube_id}/hqdefault.jpg"
+    return {
+        "title": title,
+        "channel": channel,
+        "thumbnail_url": thumbnail_url,
+    }
 
-            metadata = {
-                "title": title,
-                "channel": channel,
-                "thumbnail_url": thumbnail_url,
-            }
 
-            logger.info(f"Fetched metadata for {youtube_id}: {title} by {channel}")
+def _fetch_oembed_metadata(youtube_id: str) -> Optional[dict]:
+    """Look a video up through YouTube's oEmbed endpoint, or None if it cannot answer."""
+    try:
+        response = get_httpx_client().get(
+            OEMBED_URL,
+            params={
+                "url": f"https://www.youtube.com/watch?v={youtube_id}",
+                "format": "json",
+            },
+            timeout=OEMBED_TIMEOUT_SECONDS,
+        )
+        if response.status_code != 200:
+            logger.debug(f"oEmbed returned {response.status_code} for {youtube_id}")
+            return None
+        video_info = response.json()
+    except Exception as e:
+        logger.debug(f"oEmbed lookup failed for {youtube_id}: {e}")
+        return None
+
+    if not isinstance(video_info, dict) or not video_info.get("title"):
+        return None
+    return _metadata_from_info(
+        youtube_id,
+        {"title": video_info["title"], "channel": video_info.get("author_name")},
+    )
+
+
+def _fetch_video_metadata(youtube_id: str) -> Optional[dict]:
+    """Run yt-dlp for a video and build its metadata dict, or None on failure."""
+    try:
+        result = _run_metadata_lookup(youtube_id)
+        if result is None:
+            logger.error(f"Timeout fetching metadata for {youtube_id}")
+            return None
+
+        if result.returncode == 0:
+            metadata = _metadata_from_info(youtube_id, json.loads(result.stdout))
+            logger.info(
+                f"Fetched metadata for {youtube_id}: "
+                f"{metadata['title']} by {metadata['channel']}"
+            )
             return metadata
         else:
-            logger.error(f"yt-dlp failed for {youtube_id}: {result.stderr}")
+            stderr = result.stderr.decode("utf-8", errors="replace")
+            logger.error(f"yt-dlp failed for {youtube_id}: {stderr}")
             return None
 
-    except subprocess.TimeoutExpired:
-        logger.error(f"Timeout fetching metadata for {youtube_id}")
-        return None
-    except json.JSONDecodeError as e:
+    except ValueError as e:
         logger.error(f"Failed to parse yt-dlp output for {youtube_id}: {e}")
         return None
     except Exception as e:
@@ -80,6 +412,29 @@ def get_video_metadata(youtube_id: str) -> Optional[dict]:
         return None
 
 
+def _run_metadata_lookup(
+    youtube_id: str,
+) -> Optional["subprocess.CompletedProcess[bytes]"]:
+    """Run yt-dlp for one video, retrying a timed-out attempt; None if all time out."""
+    for attempt in range(1, METADATA_ATTEMPTS + 1):
+        try:
+            # Raw bytes: stdout goes straight to json.loads, and stderr is only
+            # decoded when it is logged
+            result = subprocess.run(
+                _metadata_command([youtube_id]),
+                capture_output=True,
+                timeout=METADATA_TIMEOUT_SECONDS,
+            )
+        except subprocess.TimeoutExpired:
+            continue
+        if attempt > 1:
+            logger.debug(
+                f"yt-dlp lookup for {youtube_id} succeeded on attempt {attempt}"
+            )
+        return result
+    return None
+
+
 def get_video_title(youtube_id: str) -> Optional[str]:
     """
     Fetch the title of a YouTube video using yt-dlp.
@@ -106,12 +461,15 @@ def extract_video_id(url_or_id: str) -> str:
     Returns:
         The video ID
     """
-    from urllib.parse import urlparse, parse_qs
-
     # If it doesn't look like a URL, assume it's already an ID
     if not url_or_id.startswith("http"):
         return url_or_id
 
+    # Common URL shapes resolve with one regex match
+    match = _CANONICAL_VIDEO_URL_RE.match(url_or_id)
+    if match:
+        return match.group(1) or match.group(2)
+
     parsed = urlparse(url_or_id)
 
     # Handle youtu.be short URLs
@@ -121,8 +479,15 @@ def extract_video_id(url_or_id: str) -> str:
     # Handle youtube.com URLs
     if parsed.hostname in ["www.youtube.com", "youtube.com", "m.youtube.com"]:
         if parsed.path == "/watch":
-            query_params = parse_qs(parsed.query)
-            return query_params.get("v", [url_or_id])[0]
+            # Only v is read, so scan for it instead of decoding every
+            # parameter; percent-encoded queries keep the full parse
+            if "%" in parsed.query:
+                query_params = parse_qs(parsed.query)
+                return query_params.get("v", [url_or_id])[0]
+            match = _WATCH_QUERY_V_RE.search(parsed.query)
+            if not match:
+                return url_or_id
+            return match.group(1).replace("+", " ")
         elif parsed.path.startswith("/embed/"):
             return parsed.path.split("/embed/")[1].split("?")[0]
         elif parsed.path.startswith("/v/"):
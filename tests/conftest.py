@@ -1,17 +1,11 @@
 """Pytest configuration and fixtures."""
 
 import os
-import sys
 import tempfile
-from pathlib import Path
 from unittest.mock import Mock
 import pytest
 from fastapi.testclient import TestClient
 
-# Add project root to path
-project_root = Path(__file__).parent.parent
-sys.path.insert(0, str(project_root))
-
 
 @pytest.fixture
 def mock_config():
@@ -177,10 +171,8 @@ def mock_openai_client():
     """Mock OpenAI client."""
     client = Mock()
 
-    # Mock audio transcription
-    transcription = Mock()
-    transcription.text = "Mocked transcription text"
-    client.audio.transcriptions.create = Mock(return_value=transcription)
+    # Mock audio transcription (response_format="text" returns a plain str)
+    client.audio.transcriptions.create = Mock(return_value="Mocked transcription text")
 
     # Mock chat completion
     completion = Mock()
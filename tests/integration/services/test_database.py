@@ -20,6 +20,8 @@ from services.database import (
     get_playback_position,
     clear_playback_position,
     get_playback_positions_batch,
+    save_video_metadata,
+    get_video_metadata_batch,
 )
 
 # Note: The temp_db fixture from conftest.py is used automatically
@@ -555,3 +557,40 @@ class TestGetQueueHash:
         add_to_queue("vid2", "Video 2")
         h2 = get_queue_hash()
         assert h1 != h2
+
+
+class TestVideoMetadata:
+    """Tests for stored YouTube metadata."""
+
+    def test_save_and_get_batch(self, db_path):
+        """Test that saved metadata is returned for the requested IDs only."""
+        init_database()
+        save_video_metadata(
+            {
+                "vid1": {"title": "One", "channel": "C1", "thumbnail_url": "t1"},
+                "vid2": {"title": "Two", "channel": None, "thumbnail_url": None},
+            }
+        )
+
+        result = get_video_metadata_batch(["vid1", "vid2", "missing"])
+
+        assert set(result) == {"vid1", "vid2"}
+        assert result["vid1"].title == "One"
+        assert result["vid1"].channel == "C1"
+        assert result["vid2"].channel is None
+        assert result["vid1"].fetched_at
+
+    def test_save_updates_existing(self, db_path):
+        """Test that saving again replaces the stored metadata."""
+        init_database()
+        save_video_metadata({"vid1": {"title": "Old"}})
+        save_video_metadata({"vid1": {"title": "New", "channel": "C1"}})
+
+        assert get_video_metadata_batch(["vid1"])["vid1"].title == "New"
+
+    def test_empty_inputs(self, db_path):
+        """Test that empty inputs do not touch the database."""
+        init_database()
+        save_video_metadata({})
+
+        assert get_video_metadata_batch([]) == {}
@@ -6,9 +6,6 @@ from pathlib import Path
 
 import pytest
 
-import sys
-
-sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent))
 from generate_version import get_git_hash, get_git_branch, generate_version_file
 
 
@@ -485,7 +485,7 @@ class TestSuggestionsEndpoint:
         assert response.status_code == 400
         assert "disabled" in response.json()["detail"]
 
-    @patch("routes.queue.get_video_metadata")
+    @patch("routes.queue.get_videos_metadata")
     @patch("routes.queue.add_to_queue")
     @patch("routes.queue.enqueue_audio_prefetch")
     @patch("services.book_suggestions.get_video_suggestions")
@@ -519,19 +519,19 @@ class TestSuggestionsEndpoint:
             },
         ]
 
-        # Mock metadata fetching
-        mock_get_metadata.side_effect = [
-            {
+        # Mock metadata fetching (one batch for all suggestions)
+        mock_get_metadata.return_value = {
+            "dQw4w9WgXcQ": {
                 "title": "Atomic Habits Full Audiobook",
                 "channel": "Audiobooks Channel",
                 "thumbnail_url": "https://example.com/thumb1.jpg",
             },
-            {
+            "jNQXAC9IVRw": {
                 "title": "Deep Work Audiobook",
                 "channel": "Books Audio",
                 "thumbnail_url": "https://example.com/thumb2.jpg",
             },
-        ]
+        }
 
         # Mock queue addition
         mock_add_to_queue.side_effect = [1, 2]
@@ -545,6 +545,7 @@ class TestSuggestionsEndpoint:
         assert data["added"][0]["video_id"] == "dQw4w9WgXcQ"
         assert data["added"][0]["title"] == "Atomic Habits Full Audiobook"
         assert mock_enqueue.call_count == 2
+        mock_get_metadata.assert_called_once_with(["dQw4w9WgXcQ", "jNQXAC9IVRw"])
 
     @patch("services.book_suggestions.get_video_suggestions")
     @patch("routes.queue.config")
@@ -563,7 +564,7 @@ class TestSuggestionsEndpoint:
         assert data["status"] == "no_suggestions"
         assert len(data.get("added", [])) == 0
 
-    @patch("routes.queue.get_video_metadata")
+    @patch("routes.queue.get_videos_metadata")
     @patch("routes.queue.add_to_queue")
     @patch("routes.queue.enqueue_audio_prefetch")
     @patch("services.book_suggestions.get_video_suggestions")
@@ -596,11 +597,14 @@ class TestSuggestionsEndpoint:
             },
         ]
 
-        # First succeeds, second fails
-        mock_get_metadata.side_effect = [
-            {"title": "Book 1", "channel": "Channel", "thumbnail_url": "url"},
-            None,  # Metadata fetch fails
-        ]
+        # First succeeds, second is missing from the batch result
+        mock_get_metadata.return_value = {
+            "dQw4w9WgXcQ": {
+                "title": "Book 1",
+                "channel": "Channel",
+                "thumbnail_url": "url",
+            },
+        }
 
         mock_add_to_queue.side_effect = [1, 2]
 
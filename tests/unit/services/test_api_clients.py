@@ -1,7 +1,7 @@
 """Tests for API client initialization."""
 
 from unittest.mock import Mock, patch
-from services.api_clients import get_openai_client, get_httpx_client
+from services.api_clients import get_gemini_client, get_httpx_client, get_openai_client
 
 
 class TestGetOpenAIClient:
@@ -107,3 +107,30 @@ class TestGetHttpxClient:
         assert call_kwargs["timeout"] == 30.0
         assert mock_httpx_class.call_count == 1
         assert client is mock_client
+
+
+class TestGetGeminiClient:
+    """Tests for get_gemini_client function."""
+
+    @patch("services.api_clients.HttpOptions")
+    @patch("services.api_clients.genai.Client")
+    @patch("services.api_clients.httpx.Client")
+    def test_reuses_client_per_api_key(
+        self, mock_httpx_class, mock_genai_class, mock_http_options
+    ):
+        """Test that the Gemini client is built once per API key."""
+        import services.api_clients
+
+        services.api_clients._gemini_clients.clear()
+        mock_genai_class.side_effect = lambda **kwargs: Mock()
+
+        client1 = get_gemini_client("key-a")
+        client2 = get_gemini_client("key-a")
+        client3 = get_gemini_client("key-b")
+
+        assert client1 is client2
+        assert client3 is not client1
+        assert mock_genai_class.call_count == 2
+        assert mock_httpx_class.call_count == 2
+
+        services.api_clients._gemini_clients.clear()
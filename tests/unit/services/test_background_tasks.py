@@ -2,9 +2,12 @@
 
 import os
 import tempfile
+import threading
 from datetime import datetime, timedelta, timezone
 from unittest.mock import Mock, patch
 
+import pytest
+
 from services.background_tasks import (
     TranscriptionJob,
     JobStatus,
@@ -304,6 +307,28 @@ class TestTranscriptionWorker:
 
         assert worker.running is False
 
+    def test_stop_shuts_down_dedup_executor(self):
+        """stop() releases the dedup check thread pool."""
+        worker = TranscriptionWorker(TranscriptionQueue())
+
+        worker.stop()
+
+        with pytest.raises(RuntimeError):
+            worker._dedup_executor.submit(lambda: None)
+
+    def test_restart_after_stop_runs_dedup_checks(self):
+        """start() after stop() gives the worker a usable dedup check pool."""
+        worker = TranscriptionWorker(TranscriptionQueue())
+
+        with patch.object(worker, "_worker_loop"):
+            worker.start()
+            worker.stop()
+            worker.start()
+            try:
+                assert worker._dedup_executor.submit(lambda: 42).result(timeout=5) == 42
+            finally:
+                worker.stop()
+
 
 class TestWaitForFile:
     """Tests for TranscriptionWorker._wait_for_file."""
@@ -403,6 +428,44 @@ class TestProcessJob:
         assert queue.jobs["exists"].status == JobStatus.SKIPPED
         assert queue.jobs["exists"].trilium_note_id == "n1"
 
+    def test_dedup_check_overlaps_file_wait(self):
+        """Trilium dedup check runs while the audio download is still pending."""
+        worker, queue = self._make_worker()
+        job = TranscriptionJob(video_id="overlap", audio_path="/tmp/overlap.mp3")
+        queue.add_job(job)
+
+        checked = threading.Event()
+
+        def check_fn(video_id):
+            checked.set()
+            return {"noteId": "n1", "url": "http://trilium/n1"}
+
+        # The file only becomes "ready" once the dedup check has run
+        def wait_for_file(audio_path, video_id):
+            return checked.wait(timeout=5)
+
+        with patch.object(worker, "_wait_for_file", side_effect=wait_for_file):
+            worker._process_job(job, check_fn, Mock(), Mock(), Mock())
+
+        assert queue.jobs["overlap"].status == JobStatus.SKIPPED
+
+    def test_file_wait_failure_cancels_dedup_check(self):
+        """A failed download cancels the dedup check that was started for it."""
+        worker, queue = self._make_worker()
+        job = TranscriptionJob(video_id="nofile", audio_path="/tmp/nofile.mp3")
+        queue.add_job(job)
+        future = Mock()
+
+        with (
+            patch.object(worker._dedup_executor, "submit", return_value=future),
+            patch.object(worker, "_wait_for_file", return_value=False),
+        ):
+            worker._process_job(job, Mock(), Mock(), Mock(), Mock())
+
+        future.cancel.assert_called_once()
+        future.result.assert_not_called()
+        assert queue.jobs["nofile"].status == JobStatus.FAILED
+
     def test_full_pipeline_success(self):
         """Full transcribe -> summarize -> post pipeline completes."""
         worker, queue = self._make_worker()
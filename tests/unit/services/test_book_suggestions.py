@@ -1,9 +1,15 @@
 """Tests for book suggestions service."""
 
+import io
+import threading
+import time
+
 import pytest
-import subprocess
 from unittest.mock import Mock, patch
+
+import services.book_suggestions as book_suggestions
 from services.book_suggestions import (
+    SEARCH_PRINT_TEMPLATE,
     _extract_text_from_html,
     _fetch_summary_for_video,
     _parse_video_json_line,
@@ -16,21 +22,45 @@ from services.book_suggestions import (
 )
 from services.models import PlayHistoryItem, VideoSummary
 
+# Patch the module-local binding rather than the global subprocess.Popen
+_POPEN = "services.book_suggestions._popen"
+
+_LONG_VIDEO = '{{"id": "{}", "title": "{}", "duration": 3600, "uploader": "Channel"}}\n'
+
+
+def _search_process(stdout, returncode=0):
+    """Fake yt-dlp search process whose output has already been printed."""
+    process = Mock()
+    process.stdout = stdout if not isinstance(stdout, str) else io.StringIO(stdout)
+    process.returncode = returncode
+    process.poll.return_value = returncode
+    return process
+
 
 @pytest.fixture
-def mock_config():
-    """Mock configuration."""
-    config = Mock()
-    config.trilium_url = "http://localhost:8080"
-    config.trilium_etapi_token = "test_token"
-    config.trilium_parent_note_id = "parent123"
-    config.book_suggestions_enabled = True
-    config.books_to_analyze = 10
-    config.suggestions_count = 4
-    config.suggestions_ai_provider = "openai"
-    config.openai_api_key = "sk-test"
-    config.gemini_api_key = None
-    return config
+def cfg(monkeypatch):
+    """Override attributes on the real book_suggestions config for one test."""
+
+    def _set(**overrides):
+        for key, value in overrides.items():
+            monkeypatch.setattr(book_suggestions.config, key, value)
+
+    return _set
+
+
+@pytest.fixture
+def item():
+    """Single play history item used by summary fetch tests."""
+    return PlayHistoryItem(
+        id=1,
+        youtube_id="vid1",
+        title="Test Video",
+        channel=None,
+        thumbnail_url=None,
+        play_count=1,
+        created_at="2024-01-01T00:00:00",
+        last_played_at="2024-01-01T00:00:00",
+    )
 
 
 class TestExtractTextFromHtml:
@@ -92,6 +122,16 @@ class TestParseVideoJsonLine:
         result = _parse_video_json_line(line)
         assert result is None  # Should be filtered out
 
+    def test_parse_null_fields(self):
+        """Test that null fields from yt-dlp fall back instead of failing."""
+        line = '{"id": "nulls", "title": null, "uploader": null, "duration": null}'
+        assert _parse_video_json_line(line) is None  # unknown duration is filtered
+
+        line = '{"id": "long", "title": null, "uploader": null, "duration": 3600}'
+        result = _parse_video_json_line(line)
+        assert result["title"] == ""
+        assert result["channel"] == "Unknown"
+
     def test_parse_long_video_accepted(self):
         """Test that videos longer than 10 minutes are accepted."""
         line = '{"id": "long", "title": "Long Video", "duration": 3600, "uploader": "Channel"}'
@@ -103,92 +143,44 @@ class TestParseVideoJsonLine:
 class TestFetchSummaryForVideo:
     """Tests for fetching summary from Trilium."""
 
+    @pytest.mark.parametrize(
+        "note_info,content,expected",
+        [
+            # Successful summary fetch
+            (
+                {"noteId": "note123", "url": "http://trilium/note123"},
+                "<h3>Summary</h3><p>Test summary content</p>",
+                "Test summary content",
+            ),
+            # No Trilium note exists
+            (None, None, None),
+            # Note content fetch fails
+            ({"noteId": "note123"}, None, None),
+            # HTML extraction yields empty text
+            ({"noteId": "note123"}, "<div></div>", None),
+        ],
+        ids=["success", "no_note", "no_content", "empty_text"],
+    )
     @patch("services.trilium.get_note_content")
     @patch("services.trilium.check_video_exists")
-    def test_fetch_summary_success(self, mock_check, mock_get_content):
-        """Test successful summary fetch."""
-        item = PlayHistoryItem(
-            id=1,
-            youtube_id="vid1",
-            title="Test Video",
-            channel=None,
-            thumbnail_url=None,
-            play_count=1,
-            created_at="2024-01-01T00:00:00",
-            last_played_at="2024-01-01T00:00:00",
-        )
-
-        mock_check.return_value = {"noteId": "note123", "url": "http://trilium/note123"}
-        mock_get_content.return_value = "<h3>Summary</h3><p>Test summary content</p>"
+    def test_fetch_summary(
+        self, mock_check, mock_get_content, item, note_info, content, expected
+    ):
+        """Test summary fetch outcomes for a single history item."""
+        mock_check.return_value = note_info
+        mock_get_content.return_value = content
 
         result = _fetch_summary_for_video(item)
 
+        if expected is None:
+            assert result is None
+            return
+
         assert result is not None
         assert result.video_id == "vid1"
         assert result.title == "Test Video"
-        assert "Test summary content" in result.summary
-        assert result.note_url == "http://trilium/note123"
-
-    @patch("services.trilium.check_video_exists")
-    def test_fetch_summary_no_note(self, mock_check):
-        """Test when no Trilium note exists."""
-        item = PlayHistoryItem(
-            id=1,
-            youtube_id="vid1",
-            title="Test Video",
-            channel=None,
-            thumbnail_url=None,
-            play_count=1,
-            created_at="2024-01-01T00:00:00",
-            last_played_at="2024-01-01T00:00:00",
-        )
-
-        mock_check.return_value = None
-
-        result = _fetch_summary_for_video(item)
-        assert result is None
-
-    @patch("services.trilium.get_note_content")
-    @patch("services.trilium.check_video_exists")
-    def test_fetch_summary_no_content(self, mock_check, mock_get_content):
-        """Test when note content fetch fails."""
-        item = PlayHistoryItem(
-            id=1,
-            youtube_id="vid1",
-            title="Test Video",
-            channel=None,
-            thumbnail_url=None,
-            play_count=1,
-            created_at="2024-01-01T00:00:00",
-            last_played_at="2024-01-01T00:00:00",
-        )
-
-        mock_check.return_value = {"noteId": "note123"}
-        mock_get_content.return_value = None
-
-        result = _fetch_summary_for_video(item)
-        assert result is None
-
-    @patch("services.trilium.get_note_content")
-    @patch("services.trilium.check_video_exists")
-    def test_fetch_summary_empty_text(self, mock_check, mock_get_content):
-        """Test when HTML extraction yields empty text."""
-        item = PlayHistoryItem(
-            id=1,
-            youtube_id="vid1",
-            title="Test Video",
-            channel=None,
-            thumbnail_url=None,
-            play_count=1,
-            created_at="2024-01-01T00:00:00",
-            last_played_at="2024-01-01T00:00:00",
-        )
-
-        mock_check.return_value = {"noteId": "note123"}
-        mock_get_content.return_value = "<div></div>"  # Empty content
-
-        result = _fetch_summary_for_video(item)
-        assert result is None
+        assert expected in result.summary
+        assert result.note_url == note_info["url"]
 
 
 class TestGetRecentSummaries:
@@ -226,14 +218,18 @@ class TestGetRecentSummaries:
         ]
 
         # Mock Trilium note existence and content
-        mock_check_video.side_effect = [
-            {"noteId": "note1"},
-            {"noteId": "note2"},
-        ]
-        mock_get_content.side_effect = [
-            "<h3>Summary</h3><p>This is the summary for video 1.</p>",
-            "<h3>Summary</h3><p>This is the summary for video 2.</p>",
-        ]
+        mock_check_video.side_effect = iter(
+            [
+                {"noteId": "note1"},
+                {"noteId": "note2"},
+            ]
+        )
+        mock_get_content.side_effect = iter(
+            [
+                "<h3>Summary</h3><p>This is the summary for video 1.</p>",
+                "<h3>Summary</h3><p>This is the summary for video 2.</p>",
+            ]
+        )
 
         # Call function
         summaries = get_recent_summaries(5)
@@ -244,6 +240,22 @@ class TestGetRecentSummaries:
         assert summaries[0].title == "Video 1"
         assert "summary for video 1" in summaries[0].summary
 
+    @patch("services.trilium.get_note_content")
+    @patch("services.trilium.check_video_exists")
+    @patch("services.book_suggestions.get_history")
+    def test_uses_provided_history(
+        self, mock_get_history, mock_check_video, mock_get_content, item
+    ):
+        """Test that provided history is used instead of querying the database."""
+        mock_check_video.return_value = {"noteId": "note123"}
+        mock_get_content.return_value = "<h3>Summary</h3><p>Test content</p>"
+
+        summaries = get_recent_summaries(1, history=[item])
+
+        assert len(summaries) == 1
+        assert summaries[0].video_id == "vid1"
+        mock_get_history.assert_not_called()
+
     @patch("services.book_suggestions.get_history")
     def test_get_recent_summaries_empty(self, mock_get_history):
         """Test when no history found."""
@@ -421,13 +433,12 @@ class TestGenerateThemeGemini:
 class TestSearchYoutubeByTheme:
     """Tests for YouTube theme-based search."""
 
-    @patch("subprocess.run")
-    def test_search_success(self, mock_run):
+    @patch(_POPEN)
+    def test_search_success(self, mock_popen):
         """Test successful YouTube search."""
-        mock_result = Mock()
-        mock_result.returncode = 0
-        mock_result.stdout = '{"id": "abc123", "title": "Atomic Habits Audiobook", "duration": 3600, "uploader": "Channel"}\n'
-        mock_run.return_value = mock_result
+        mock_popen.return_value = _search_process(
+            _LONG_VIDEO.format("abc123", "Atomic Habits Audiobook")
+        )
 
         videos = search_youtube_by_theme("Atomic Habits", 1)
 
@@ -435,77 +446,142 @@ class TestSearchYoutubeByTheme:
         assert videos[0]["video_id"] == "abc123"
         assert videos[0]["title"] == "Atomic Habits Audiobook"
 
-    @patch("subprocess.run")
-    def test_search_short_video_filtered(self, mock_run):
+        args = mock_popen.call_args[0][0]
+        assert args[args.index("--print") + 1] == SEARCH_PRINT_TEMPLATE
+        assert "--dump-json" not in args
+        assert "--no-warnings" in args
+
+    @patch(_POPEN)
+    def test_search_short_video_filtered(self, mock_popen):
         """Test that short videos (< 10 minutes) are filtered out."""
-        mock_result = Mock()
-        mock_result.returncode = 0
         # Video is only 5 minutes (300 seconds) - too short
-        mock_result.stdout = '{"id": "short1", "title": "Atomic Habits Summary", "duration": 300, "uploader": "Channel"}\n'
-        mock_run.return_value = mock_result
+        mock_popen.return_value = _search_process(
+            '{"id": "short1", "title": "Atomic Habits Summary", "duration": 300, "uploader": "Channel"}\n'
+        )
 
         videos = search_youtube_by_theme("Atomic Habits", 1)
 
         assert len(videos) == 0
 
-    @patch("subprocess.run")
-    def test_search_filters_short_keeps_long(self, mock_run):
+    @patch(_POPEN)
+    def test_search_filters_short_keeps_long(self, mock_popen):
         """Test that search filters short videos but keeps long ones."""
-        mock_result = Mock()
-        mock_result.returncode = 0
-        mock_result.stdout = (
+        mock_popen.return_value = _search_process(
             '{"id": "short1", "title": "Short Video", "duration": 300, "uploader": "Channel"}\n'
-            '{"id": "long1", "title": "Long Video", "duration": 3600, "uploader": "Channel"}\n'
+            + _LONG_VIDEO.format("long1", "Long Video")
         )
-        mock_run.return_value = mock_result
 
         videos = search_youtube_by_theme("test theme", 1)
 
         assert len(videos) == 1
         assert videos[0]["video_id"] == "long1"
 
-    @patch("subprocess.run")
-    def test_search_error(self, mock_run):
-        """Test error handling in YouTube search."""
-        mock_result = Mock()
-        mock_result.returncode = 1
-        mock_result.stderr = "Search failed"
-        mock_run.return_value = mock_result
+    @patch(_POPEN)
+    def test_search_stops_once_count_reached(self, mock_popen):
+        """Test that yt-dlp is stopped as soon as enough videos are read."""
+        process = _search_process(
+            _LONG_VIDEO.format("first", "First")
+            + _LONG_VIDEO.format("second", "Second")
+        )
+        process.poll.return_value = None
+        mock_popen.return_value = process
 
         videos = search_youtube_by_theme("test theme", 1)
 
-        assert len(videos) == 0
+        assert [v["video_id"] for v in videos] == ["first"]
+        process.terminate.assert_called_once()
+        process.wait.assert_called_once()
+        assert process.stdout.closed
 
-    @patch("subprocess.run")
-    def test_search_timeout(self, mock_run):
-        """Test handling of subprocess timeout."""
-        mock_run.side_effect = subprocess.TimeoutExpired(cmd="yt-dlp", timeout=30)
+    @patch(_POPEN)
+    def test_search_error(self, mock_popen):
+        """Test error handling in YouTube search."""
+        mock_popen.return_value = _search_process("", returncode=1)
 
         videos = search_youtube_by_theme("test theme", 1)
 
         assert len(videos) == 0
 
-    @patch("subprocess.run")
-    def test_search_exception(self, mock_run):
+    @patch(_POPEN)
+    def test_search_error_keeps_streamed_videos(self, mock_popen):
+        """Test that videos printed before yt-dlp failed are still returned."""
+        mock_popen.return_value = _search_process(
+            _LONG_VIDEO.format("valid1", "Valid Video"), returncode=1
+        )
+
+        videos = search_youtube_by_theme("test theme", 2)
+
+        assert [v["video_id"] for v in videos] == ["valid1"]
+
+    @patch(_POPEN)
+    def test_search_timeout(self, mock_popen, monkeypatch):
+        """Test that a stalled search is killed and partial results kept."""
+        monkeypatch.setattr(book_suggestions, "SEARCH_TIMEOUT_SECONDS", 0.05)
+        killed = threading.Event()
+
+        def stalled_output():
+            yield _LONG_VIDEO.format("valid1", "Valid Video")
+            killed.wait(timeout=5)
+
+        process = _search_process(stalled_output(), returncode=-9)
+        process.kill.side_effect = killed.set
+        mock_popen.return_value = process
+
+        videos = search_youtube_by_theme("test theme", 2)
+
+        assert killed.is_set()
+        assert [v["video_id"] for v in videos] == ["valid1"]
+
+    @patch(_POPEN)
+    def test_search_timeout_reported_while_kill_in_progress(
+        self, mock_popen, monkeypatch, caplog
+    ):
+        """Test that a timeout is reported even if output ends before kill returns."""
+        monkeypatch.setattr(book_suggestions, "SEARCH_TIMEOUT_SECONDS", 0.05)
+        output_closed = threading.Event()
+        kill_returned = threading.Event()
+
+        def stalled_output():
+            output_closed.wait(timeout=5)
+            yield from ()
+
+        def slow_kill():
+            # The child dies (closing stdout) before kill() returns to the timer
+            output_closed.set()
+            time.sleep(0.2)
+            kill_returned.set()
+
+        process = _search_process(stalled_output(), returncode=-9)
+        process.kill.side_effect = slow_kill
+        mock_popen.return_value = process
+
+        with caplog.at_level("WARNING", logger="services.book_suggestions"):
+            videos = search_youtube_by_theme("test theme", 1)
+
+        assert videos == []
+        assert not kill_returned.is_set()
+        assert "Timeout searching YouTube" in caplog.text
+        assert "YouTube search failed" not in caplog.text
+        kill_returned.wait(timeout=5)
+
+    @patch(_POPEN)
+    def test_search_exception(self, mock_popen):
         """Test handling of general exception."""
-        mock_run.side_effect = Exception("Unexpected error")
+        mock_popen.side_effect = Exception("Unexpected error")
 
         videos = search_youtube_by_theme("test theme", 1)
 
         assert len(videos) == 0
 
-    @patch("subprocess.run")
-    def test_search_invalid_json_line(self, mock_run):
+    @patch(_POPEN)
+    def test_search_invalid_json_line(self, mock_popen):
         """Test handling of invalid JSON in output."""
-        mock_result = Mock()
-        mock_result.returncode = 0
         # Mix of valid and invalid JSON lines
-        mock_result.stdout = (
-            '{"id": "valid1", "title": "Valid Video", "duration": 3600, "uploader": "Channel"}\n'
-            "invalid json line\n"
-            '{"id": "valid2", "title": "Another Video", "duration": 3600, "uploader": "Channel"}\n'
+        mock_popen.return_value = _search_process(
+            _LONG_VIDEO.format("valid1", "Valid Video")
+            + "invalid json line\n"
+            + _LONG_VIDEO.format("valid2", "Another Video")
         )
-        mock_run.return_value = mock_result
 
         videos = search_youtube_by_theme("test theme", 2)
 
@@ -591,6 +667,27 @@ class TestFilterAlreadyPlayed:
 
         assert len(filtered) == 0
 
+    @patch("services.book_suggestions.get_history")
+    def test_filter_with_played_ids_skips_history(self, mock_get_history):
+        """Test that precomputed played IDs are used instead of querying history."""
+        suggestions = [
+            {"video_id": "abc123", "title": "Already Played"},
+            {"video_id": "xyz789", "title": "New Video"},
+        ]
+
+        filtered = filter_already_played(suggestions, played_ids=frozenset({"abc123"}))
+
+        assert [v["video_id"] for v in filtered] == ["xyz789"]
+        mock_get_history.assert_not_called()
+
+    @patch("services.book_suggestions.get_history")
+    def test_filter_empty_skips_history(self, mock_get_history):
+        """Test that empty input returns early without querying history."""
+        filtered = filter_already_played([])
+
+        assert filtered == []
+        mock_get_history.assert_not_called()
+
     @patch("services.book_suggestions.get_history")
     def test_filter_error_handling(self, mock_get_history):
         """Test error handling in filter."""
@@ -611,21 +708,21 @@ class TestGetVideoSuggestions:
     @patch("services.book_suggestions.search_youtube_by_theme")
     @patch("services.book_suggestions.generate_theme_openai")
     @patch("services.book_suggestions.get_recent_summaries")
-    @patch("services.book_suggestions.config")
     def test_full_workflow_success(
         self,
-        mock_config_module,
         mock_get_summaries,
         mock_generate_theme,
         mock_search,
         mock_filter,
-        mock_config,
+        cfg,
     ):
         """Test complete suggestion workflow."""
-        mock_config_module.book_suggestions_enabled = True
-        mock_config_module.books_to_analyze = 10
-        mock_config_module.suggestions_count = 4
-        mock_config_module.suggestions_ai_provider = "openai"
+        cfg(
+            book_suggestions_enabled=True,
+            books_to_analyze=10,
+            suggestions_count=4,
+            suggestions_ai_provider="openai",
+        )
 
         # Mock summaries
         mock_get_summaries.return_value = [
@@ -656,22 +753,55 @@ class TestGetVideoSuggestions:
         mock_generate_theme.assert_called_once()
         mock_search.assert_called_once()
 
-    @patch("services.book_suggestions.config")
-    def test_disabled_feature(self, mock_config_module, mock_config):
+    @patch("services.book_suggestions.filter_already_played")
+    @patch("services.book_suggestions.search_youtube_by_theme")
+    @patch("services.book_suggestions.generate_theme_openai")
+    @patch("services.book_suggestions.get_recent_summaries")
+    @patch("services.book_suggestions.get_history")
+    def test_history_loaded_once(
+        self,
+        mock_get_history,
+        mock_get_summaries,
+        mock_generate_theme,
+        mock_search,
+        mock_filter,
+        cfg,
+        item,
+    ):
+        """Test that play history is queried once and shared across the pipeline."""
+        cfg(
+            book_suggestions_enabled=True,
+            books_to_analyze=10,
+            suggestions_count=4,
+            suggestions_ai_provider="openai",
+        )
+        mock_get_history.return_value = [item]
+        mock_get_summaries.return_value = [
+            VideoSummary(video_id="vid1", title="Test Video", summary="Summary 1")
+        ]
+        mock_generate_theme.return_value = "test theme"
+        mock_videos = [{"video_id": "new1", "title": "Suggestion 1"}]
+        mock_search.return_value = mock_videos
+        mock_filter.return_value = mock_videos
+
+        get_video_suggestions()
+
+        mock_get_history.assert_called_once()
+        mock_get_summaries.assert_called_once_with(10, history=[item])
+        mock_filter.assert_called_once_with(mock_videos, played_ids=frozenset({"vid1"}))
+
+    def test_disabled_feature(self, cfg):
         """Test when feature is disabled."""
-        mock_config_module.book_suggestions_enabled = False
+        cfg(book_suggestions_enabled=False)
 
         result = get_video_suggestions()
 
         assert len(result) == 0
 
     @patch("services.book_suggestions.get_recent_summaries")
-    @patch("services.book_suggestions.config")
-    def test_no_summaries_found(
-        self, mock_config_module, mock_get_summaries, mock_config
-    ):
+    def test_no_summaries_found(self, mock_get_summaries, cfg):
         """Test when no summaries found."""
-        mock_config_module.book_suggestions_enabled = True
+        cfg(book_suggestions_enabled=True)
         mock_get_summaries.return_value = []
 
         result = get_video_suggestions()
@@ -680,15 +810,14 @@ class TestGetVideoSuggestions:
 
     @patch("services.book_suggestions.generate_theme_gemini")
     @patch("services.book_suggestions.get_recent_summaries")
-    @patch("services.book_suggestions.config")
-    def test_gemini_provider(
-        self, mock_config_module, mock_get_summaries, mock_generate_gemini, mock_config
-    ):
+    def test_gemini_provider(self, mock_get_summaries, mock_generate_gemini, cfg):
         """Test with Gemini as AI provider."""
-        mock_config_module.book_suggestions_enabled = True
-        mock_config_module.books_to_analyze = 10
-        mock_config_module.suggestions_count = 4
-        mock_config_module.suggestions_ai_provider = "gemini"
+        cfg(
+            book_suggestions_enabled=True,
+            books_to_analyze=10,
+            suggestions_count=4,
+            suggestions_ai_provider="gemini",
+        )
 
         mock_get_summaries.return_value = [
             VideoSummary(
@@ -705,14 +834,13 @@ class TestGetVideoSuggestions:
         mock_generate_gemini.assert_called_once()
 
     @patch("services.book_suggestions.get_recent_summaries")
-    @patch("services.book_suggestions.config")
-    def test_invalid_ai_provider(
-        self, mock_config_module, mock_get_summaries, mock_config
-    ):
+    def test_invalid_ai_provider(self, mock_get_summaries, cfg):
         """Test with invalid AI provider."""
-        mock_config_module.book_suggestions_enabled = True
-        mock_config_module.books_to_analyze = 10
-        mock_config_module.suggestions_ai_provider = "invalid_provider"
+        cfg(
+            book_suggestions_enabled=True,
+            books_to_analyze=10,
+            suggestions_ai_provider="invalid_provider",
+        )
 
         mock_get_summaries.return_value = [
             VideoSummary(
@@ -728,14 +856,13 @@ class TestGetVideoSuggestions:
 
     @patch("services.book_suggestions.generate_theme_openai")
     @patch("services.book_suggestions.get_recent_summaries")
-    @patch("services.book_suggestions.config")
-    def test_theme_generation_fails(
-        self, mock_config_module, mock_get_summaries, mock_generate_theme, mock_config
-    ):
+    def test_theme_generation_fails(self, mock_get_summaries, mock_generate_theme, cfg):
         """Test when theme generation returns None."""
-        mock_config_module.book_suggestions_enabled = True
-        mock_config_module.books_to_analyze = 10
-        mock_config_module.suggestions_ai_provider = "openai"
+        cfg(
+            book_suggestions_enabled=True,
+            books_to_analyze=10,
+            suggestions_ai_provider="openai",
+        )
 
         mock_get_summaries.return_value = [
             VideoSummary(
@@ -753,20 +880,20 @@ class TestGetVideoSuggestions:
     @patch("services.book_suggestions.search_youtube_by_theme")
     @patch("services.book_suggestions.generate_theme_openai")
     @patch("services.book_suggestions.get_recent_summaries")
-    @patch("services.book_suggestions.config")
     def test_no_videos_found_from_search(
         self,
-        mock_config_module,
         mock_get_summaries,
         mock_generate_theme,
         mock_search,
-        mock_config,
+        cfg,
     ):
         """Test when YouTube search returns no videos."""
-        mock_config_module.book_suggestions_enabled = True
-        mock_config_module.books_to_analyze = 10
-        mock_config_module.suggestions_count = 4
-        mock_config_module.suggestions_ai_provider = "openai"
+        cfg(
+            book_suggestions_enabled=True,
+            books_to_analyze=10,
+            suggestions_count=4,
+            suggestions_ai_provider="openai",
+        )
 
         mock_get_summaries.return_value = [
             VideoSummary(
@@ -2,109 +2,165 @@
 
 import os
 from unittest.mock import patch
-from config import _parse_int, Config
+
+import pytest
+
+import config as config_module
+from config import _CONFIG_ENV_KEYS, _parse_int, Config
 
 
 class TestParseInt:
     """Test the _parse_int helper function."""
 
-    def test_parse_valid_integer(self):
-        """Should parse valid integer strings."""
-        assert _parse_int("42", 10) == 42
-        assert _parse_int("0", 10) == 0
-        assert _parse_int("-5", 10) == -5
-
-    def test_parse_invalid_integer_uses_default(self):
-        """Should use default for invalid input."""
-        assert _parse_int("abc", 10) == 10
-        assert _parse_int("12.5", 10) == 10
-        assert _parse_int("", 10) == 10
-        assert _parse_int(None, 10) == 10
-
-    def test_parse_with_min_bound(self):
-        """Should enforce minimum bounds."""
-        assert _parse_int("5", 10, min_val=0) == 5
-        assert _parse_int("-5", 10, min_val=0) == 10  # Below min, use default
-        assert _parse_int("0", 10, min_val=0) == 0  # Exactly at min
-
-    def test_parse_with_max_bound(self):
-        """Should enforce maximum bounds."""
-        assert _parse_int("5", 10, max_val=100) == 5
-        assert _parse_int("150", 10, max_val=100) == 10  # Above max, use default
-        assert _parse_int("100", 10, max_val=100) == 100  # Exactly at max
-
-    def test_parse_with_both_bounds(self):
-        """Should enforce both min and max bounds."""
-        assert _parse_int("50", 10, min_val=0, max_val=100) == 50
-        assert _parse_int("-5", 10, min_val=0, max_val=100) == 10
-        assert _parse_int("150", 10, min_val=0, max_val=100) == 10
+    @pytest.mark.parametrize(
+        "value,default,min_val,max_val,expected",
+        [
+            # Valid integer strings
+            ("42", 10, None, None, 42),
+            ("0", 10, None, None, 0),
+            ("-5", 10, None, None, -5),
+            # Invalid input uses default
+            ("abc", 10, None, None, 10),
+            ("12.5", 10, None, None, 10),
+            ("", 10, None, None, 10),
+            (None, 10, None, None, 10),
+            # Minimum bound
+            ("5", 10, 0, None, 5),
+            ("-5", 10, 0, None, 10),
+            ("0", 10, 0, None, 0),
+            # Maximum bound
+            ("5", 10, None, 100, 5),
+            ("150", 10, None, 100, 10),
+            ("100", 10, None, 100, 100),
+            # Both bounds
+            ("50", 10, 0, 100, 50),
+            ("-5", 10, 0, 100, 10),
+            ("150", 10, 0, 100, 10),
+        ],
+        ids=[
+            "valid",
+            "zero",
+            "negative",
+            "not_a_number",
+            "float",
+            "empty",
+            "none",
+            "above_min",
+            "below_min",
+            "at_min",
+            "below_max",
+            "above_max",
+            "at_max",
+            "within_bounds",
+            "below_both",
+            "above_both",
+        ],
+    )
+    def test_parse_int(self, value, default, min_val, max_val, expected):
+        """Should parse integers and fall back to default when invalid or out of bounds."""
+        assert _parse_int(value, default, min_val=min_val, max_val=max_val) == expected
 
 
 class TestConfigParsing:
-    """Test Config loading with invalid environment variables."""
-
-    def test_invalid_port_uses_default(self):
-        """Should use default port when invalid value provided."""
-        with patch.dict(os.environ, {"FASTAPI_API_PORT": "abc"}, clear=False):
-            config = Config.load_from_env()
-            assert config.fastapi_port == 8000
-
-    def test_port_out_of_range_uses_default(self):
-        """Should use default port when out of valid range."""
-        with patch.dict(os.environ, {"FASTAPI_API_PORT": "99999"}, clear=False):
-            config = Config.load_from_env()
-            assert config.fastapi_port == 8000
-
-        with patch.dict(os.environ, {"FASTAPI_API_PORT": "0"}, clear=False):
-            config = Config.load_from_env()
-            assert config.fastapi_port == 8000
-
-    def test_invalid_audio_quality_uses_default(self):
-        """Should use default audio quality when invalid."""
-        with patch.dict(os.environ, {"AUDIO_QUALITY": "invalid"}, clear=False):
-            config = Config.load_from_env()
-            assert config.audio_quality == 4
-
-    def test_audio_quality_out_of_range_uses_default(self):
-        """Should use default when audio quality out of range (0-9)."""
-        with patch.dict(os.environ, {"AUDIO_QUALITY": "15"}, clear=False):
-            config = Config.load_from_env()
-            assert config.audio_quality == 4
-
-        with patch.dict(os.environ, {"AUDIO_QUALITY": "-1"}, clear=False):
-            config = Config.load_from_env()
-            assert config.audio_quality == 4
-
-    def test_valid_port_is_accepted(self):
-        """Should accept valid port values."""
-        with patch.dict(os.environ, {"FASTAPI_API_PORT": "3000"}, clear=False):
-            config = Config.load_from_env()
-            assert config.fastapi_port == 3000
-
-    def test_valid_audio_quality_is_accepted(self):
-        """Should accept valid audio quality values."""
-        with patch.dict(os.environ, {"AUDIO_QUALITY": "7"}, clear=False):
-            config = Config.load_from_env()
-            assert config.audio_quality == 7
-
-    def test_client_cache_defaults(self):
+    """Test Config loading with invalid environment variables.
+
+    Each test performs a single load_from_env, so cases whose environment
+    snapshot matches an earlier one reuse the cached parse.
+    """
+
+    @pytest.mark.parametrize(
+        "env_var,value,attr,expected",
+        [
+            # Invalid or out-of-range port falls back to default
+            ("FASTAPI_API_PORT", "abc", "fastapi_port", 8000),
+            ("FASTAPI_API_PORT", "99999", "fastapi_port", 8000),
+            ("FASTAPI_API_PORT", "0", "fastapi_port", 8000),
+            # Valid port is accepted
+            ("FASTAPI_API_PORT", "3000", "fastapi_port", 3000),
+            # Invalid or out-of-range (0-9) audio quality falls back to default
+            ("AUDIO_QUALITY", "invalid", "audio_quality", 4),
+            ("AUDIO_QUALITY", "15", "audio_quality", 4),
+            ("AUDIO_QUALITY", "-1", "audio_quality", 4),
+            # Valid audio quality is accepted
+            ("AUDIO_QUALITY", "7", "audio_quality", 7),
+        ],
+    )
+    def test_integer_setting(self, monkeypatch, env_var, value, attr, expected):
+        """Should accept valid integer settings and default invalid ones."""
+        monkeypatch.setenv(env_var, value)
+
+        config = Config.load_from_env()
+
+        assert getattr(config, attr) == expected
+
+    def test_client_cache_defaults(self, monkeypatch):
         """Should load client cache settings with defaults."""
-        with patch.dict(
-            os.environ,
-            {
-                "CLIENT_CACHE_ENABLED": "true",
-                "CLIENT_CACHE_MAX_ITEMS": "5",
-                "CLIENT_CACHE_MAX_MB": "0",
-            },
-            clear=False,
-        ):
-            config = Config.load_from_env()
-            assert config.client_cache_enabled is True
-            assert config.client_cache_max_items == 5
-            assert config.client_cache_max_mb == 0
-
-    def test_client_cache_can_be_disabled(self):
+        monkeypatch.setenv("CLIENT_CACHE_ENABLED", "true")
+        monkeypatch.setenv("CLIENT_CACHE_MAX_ITEMS", "5")
+        monkeypatch.setenv("CLIENT_CACHE_MAX_MB", "0")
+
+        config = Config.load_from_env()
+
+        assert config.client_cache_enabled is True
+        assert config.client_cache_max_items == 5
+        assert config.client_cache_max_mb == 0
+
+    def test_client_cache_can_be_disabled(self, monkeypatch):
         """Should allow disabling client-side cache."""
-        with patch.dict(os.environ, {"CLIENT_CACHE_ENABLED": "false"}, clear=False):
-            config = Config.load_from_env()
-            assert config.client_cache_enabled is False
+        monkeypatch.setenv("CLIENT_CACHE_ENABLED", "false")
+
+        config = Config.load_from_env()
+
+        assert config.client_cache_enabled is False
+
+
+class TestConfigCache:
+    """Test memoization of Config.load_from_env per environment snapshot."""
+
+    @pytest.fixture(autouse=True)
+    def _fresh_config_cache(self):
+        """Start and end each cache test with an empty load_from_env cache."""
+        Config.invalidate_cache()
+        yield
+        Config.invalidate_cache()
+
+    def test_unchanged_env_reuses_parsed_config(self):
+        """Should parse once for repeated loads with the same environment."""
+        with patch.object(Config, "_parse_env", wraps=Config._parse_env) as mock_parse:
+            first = Config.load_from_env()
+            second = Config.load_from_env()
+
+        assert mock_parse.call_count == 1
+        assert first == second
+        assert first is not second  # Callers get independent copies
+
+    def test_changed_env_reparses(self, monkeypatch):
+        """Should parse again when a relevant variable changes."""
+        monkeypatch.setenv("FASTAPI_API_PORT", "3000")
+        assert Config.load_from_env().fastapi_port == 3000
+
+        monkeypatch.setenv("FASTAPI_API_PORT", "3001")
+        assert Config.load_from_env().fastapi_port == 3001
+
+    def test_invalidate_cache_forces_reparse(self):
+        """Should parse again after the cache is invalidated."""
+        with patch.object(Config, "_parse_env", wraps=Config._parse_env) as mock_parse:
+            Config.load_from_env()
+            Config.invalidate_cache()
+            Config.load_from_env()
+
+        assert mock_parse.call_count == 2
+
+    def test_cache_key_covers_all_env_reads(self):
+        """Every variable read while parsing must be part of the cache key."""
+        read_keys = []
+        real_getenv = os.getenv
+
+        def recording_getenv(key, default=None):
+            read_keys.append(key)
+            return real_getenv(key, default)
+
+        with patch.object(config_module.os, "getenv", side_effect=recording_getenv):
+            Config._parse_env()
+
+        assert set(read_keys) <= set(_CONFIG_ENV_KEYS)
@@ -2,19 +2,41 @@
 
 import json
 import subprocess
-from pathlib import Path
+from datetime import datetime
 from unittest.mock import patch, Mock
 
-import sys
+import pytest
 
-sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent))
 from generate_version import get_git_hash, get_git_branch, generate_version_file
 
 
+@pytest.fixture(scope="module")
+def version_json(tmp_path_factory):
+    """Write a sample version.json once and return its parsed content."""
+    version_data = {
+        "hash": "abc123",
+        "branch": "main",
+        "timestamp": "2026-02-10T12:00:00+00:00",
+    }
+
+    version_file = tmp_path_factory.mktemp("version") / "version.json"
+    with open(version_file, "w") as f:
+        json.dump(version_data, f, indent=2)
+
+    with open(version_file, "r") as f:
+        return json.load(f)
+
+
+@pytest.fixture
+def mock_run():
+    """Mock generate_version.subprocess.run, configured per test."""
+    with patch("generate_version.subprocess.run") as mock:
+        yield mock
+
+
 class TestGetGitHash:
     """Tests for get_git_hash function."""
 
-    @patch("generate_version.subprocess.run")
     def test_returns_hash_on_success(self, mock_run):
         """Should return git hash when git command succeeds."""
         mock_run.return_value = Mock(
@@ -31,7 +53,6 @@ class TestGetGitHash:
             check=True,
         )
 
-    @patch("generate_version.subprocess.run")
     def test_strips_whitespace(self, mock_run):
         """Should strip whitespace from git hash."""
         mock_run.return_value = Mock(stdout="  abc123def456  \n  ", returncode=0)
@@ -40,7 +61,6 @@ class TestGetGitHash:
 
         assert result == "abc123def456"
 
-    @patch("generate_version.subprocess.run")
     def test_returns_unknown_on_error(self, mock_run):
         """Should return 'unknown' when git command fails."""
         mock_run.side_effect = subprocess.CalledProcessError(1, "git")
@@ -49,7 +69,6 @@ class TestGetGitHash:
 
         assert result == "unknown"
 
-    @patch("generate_version.subprocess.run")
     def test_handles_git_not_installed(self, mock_run):
         """Should handle case when git is not installed."""
         mock_run.side_effect = subprocess.CalledProcessError(127, "git")
@@ -62,7 +81,6 @@ class TestGetGitHash:
 class TestGetGitBranch:
     """Tests for get_git_branch function."""
 
-    @patch("generate_version.subprocess.run")
     def test_returns_branch_on_success(self, mock_run):
         """Should return branch name when git command succeeds."""
         mock_run.return_value = Mock(stdout="main\n", returncode=0)
@@ -77,7 +95,6 @@ class TestGetGitBranch:
             check=True,
         )
 
-    @patch("generate_version.subprocess.run")
     def test_returns_feature_branch(self, mock_run):
         """Should return feature branch name."""
         mock_run.return_value = Mock(stdout="feature/new-feature\n", returncode=0)
@@ -86,7 +103,6 @@ class TestGetGitBranch:
 
         assert result == "feature/new-feature"
 
-    @patch("generate_version.subprocess.run")
     def test_returns_unknown_on_error(self, mock_run):
         """Should return 'unknown' when git command fails."""
         mock_run.side_effect = subprocess.CalledProcessError(1, "git")
@@ -99,20 +115,9 @@ class TestGetGitBranch:
 class TestGenerateVersionFile:
     """Unit tests for generate_version_file with mocked git and filesystem."""
 
-    def test_version_file_structure(self, tmp_path):
+    def test_version_file_structure(self, version_json):
         """Should create version file with correct JSON structure."""
-        version_data = {
-            "hash": "abc123",
-            "branch": "main",
-            "timestamp": "2026-02-10T12:00:00+00:00",
-        }
-
-        version_file = tmp_path / "version.json"
-        with open(version_file, "w") as f:
-            json.dump(version_data, f, indent=2)
-
-        with open(version_file, "r") as f:
-            data = json.load(f)
+        data = version_json
 
         assert "hash" in data
         assert "branch" in data
@@ -133,8 +138,8 @@ class TestGenerateVersionFile:
 
             instance = Mock()
             instance.parent = tmp_path
-            instance.__truediv__ = (
-                lambda self, other: static_dir if other == "static" else Mock()
+            instance.__truediv__ = lambda self, other: (
+                static_dir if other == "static" else Mock()
             )
             mock_path.return_value = instance
 
@@ -143,60 +148,19 @@ class TestGenerateVersionFile:
 
 
 class TestVersionFileFormat:
-    """Tests for version file JSON format using temp files."""
+    """Tests for version file JSON format, read back from one temp file."""
 
-    def test_version_json_is_valid_json(self, tmp_path):
+    def test_version_json_is_valid_json(self, version_json):
         """Should produce valid JSON."""
-        version_file = tmp_path / "version.json"
-        version_data = {
-            "hash": "a1b2c3d4",
-            "branch": "main",
-            "timestamp": "2026-02-10T12:00:00+00:00",
-        }
-
-        with open(version_file, "w") as f:
-            json.dump(version_data, f, indent=2)
+        assert isinstance(version_json, dict)
 
-        with open(version_file, "r") as f:
-            data = json.load(f)
-
-        assert isinstance(data, dict)
-
-    def test_hash_field_is_string(self, tmp_path):
+    def test_hash_field_is_string(self, version_json):
         """Should have hash as string type."""
-        version_file = tmp_path / "version.json"
-        version_data = {
-            "hash": "abc123",
-            "branch": "main",
-            "timestamp": "2026-02-10T12:00:00+00:00",
-        }
-
-        with open(version_file, "w") as f:
-            json.dump(version_data, f)
-
-        with open(version_file, "r") as f:
-            data = json.load(f)
-
-        assert isinstance(data["hash"], str)
-        assert len(data["hash"]) > 0
+        assert isinstance(version_json["hash"], str)
+        assert len(version_json["hash"]) > 0
 
-    def test_timestamp_is_iso_format(self, tmp_path):
+    def test_timestamp_is_iso_format(self, version_json):
         """Should have timestamp in ISO 8601 format."""
-        version_file = tmp_path / "version.json"
-        version_data = {
-            "hash": "abc123",
-            "branch": "main",
-            "timestamp": "2026-02-10T12:00:00+00:00",
-        }
-
-        with open(version_file, "w") as f:
-            json.dump(version_data, f)
-
-        with open(version_file, "r") as f:
-            data = json.load(f)
-
-        assert isinstance(data["timestamp"], str)
-        assert "T" in data["timestamp"]
-        from datetime import datetime
-
-        datetime.fromisoformat(data["timestamp"].replace("+00:00", "+00:00"))
+        assert isinstance(version_json["timestamp"], str)
+        assert "T" in version_json["timestamp"]
+        datetime.fromisoformat(version_json["timestamp"])
@@ -3,7 +3,9 @@
 from types import SimpleNamespace
 from unittest.mock import Mock, patch
 
-from services.llm_clients import TrackedGeminiClient
+import pytest
+
+from services.llm_clients import TrackedGeminiClient, TrackedOpenAIClient
 
 
 class RetryableGeminiError(Exception):
@@ -15,10 +17,19 @@ class RetryableGeminiError(Exception):
 class TestTrackedGeminiClient:
     """Tests for TrackedGeminiClient."""
 
+    @patch("services.llm_clients.get_config")
+    def test_missing_api_key_raises(self, mock_get_config):
+        """Without a key from the caller or config, construction fails early."""
+        mock_get_config.return_value = Mock(gemini_api_key=None)
+
+        with pytest.raises(ValueError, match="Gemini API key not configured"):
+            TrackedGeminiClient()
+
+    @patch("services.llm_clients.get_gemini_client")
     @patch("services.llm_clients.log_llm_usage")
     @patch("services.llm_clients.time.sleep")
     def test_generate_content_retries_retryable_gemini_error(
-        self, mock_sleep, mock_log_llm_usage
+        self, mock_sleep, mock_log_llm_usage, mock_get_gemini_client
     ):
         """Gemini text generation should retry transient 5xx failures."""
         response = SimpleNamespace(text="Recovered summary", usage_metadata=None)
@@ -32,7 +43,7 @@ class TestTrackedGeminiClient:
         client = TrackedGeminiClient.__new__(TrackedGeminiClient)
         client.api_key = "test-key"
         client.chat_model = "gemini-2.5-flash"
-        client.genai = SimpleNamespace(Client=Mock(return_value=sdk_client))
+        mock_get_gemini_client.return_value = sdk_client
 
         result = client.generate_content(
             prompt="Summarize this",
@@ -44,3 +55,31 @@ class TestTrackedGeminiClient:
         assert models.generate_content.call_count == 2
         mock_sleep.assert_called_once_with(15)
         mock_log_llm_usage.assert_called_once()
+        mock_get_gemini_client.assert_called_once_with("test-key")
+
+
+class TestTrackedOpenAIClient:
+    """Tests for TrackedOpenAIClient."""
+
+    @patch("services.llm_clients.log_llm_usage")
+    @patch("services.llm_clients.get_openai_client")
+    @patch("services.llm_clients.get_config")
+    def test_transcribe_audio_returns_text_response(
+        self, mock_get_config, mock_get_openai_client, mock_log_llm_usage
+    ):
+        """Whisper text responses are returned as-is and tracked by length."""
+        mock_get_config.return_value = SimpleNamespace(
+            transcription_model="whisper-1", summary_model="gpt-4o-mini"
+        )
+        sdk_client = Mock()
+        sdk_client.audio.transcriptions.create.return_value = "hello world"
+        mock_get_openai_client.return_value = sdk_client
+
+        client = TrackedOpenAIClient()
+        transcript = client.transcribe_audio(Mock(), video_id="vid1")
+
+        assert transcript == "hello world"
+        _, kwargs = sdk_client.audio.transcriptions.create.call_args
+        assert kwargs["response_format"] == "text"
+        _, log_kwargs = mock_log_llm_usage.call_args
+        assert log_kwargs["metadata"]["transcript_length_chars"] == 11
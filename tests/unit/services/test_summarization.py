@@ -1,8 +1,17 @@
 """Tests for summarization service."""
 
+from types import SimpleNamespace
 from unittest.mock import Mock, patch
 import pytest
-from services.summarization import summarize_transcript, SUMMARY_PROMPT_TEMPLATE
+from services.summarization import (
+    SUMMARY_PROMPT_TEMPLATE,
+    _summarize_with_gemini,
+    _summarize_with_openai,
+    summarize_transcript,
+)
+
+# Lowercased once for case-insensitive section checks
+_LOWER_PROMPT = SUMMARY_PROMPT_TEMPLATE.lower()
 
 
 class TestSummarizeTranscript:
@@ -55,8 +64,6 @@ class TestSummarizeWithOpenAI:
     @patch("services.summarization.get_config")
     def test_summarize_with_openai_no_api_key(self, mock_config):
         """Test OpenAI summarization without API key."""
-        from services.summarization import _summarize_with_openai
-
         config = Mock()
         config.openai_api_key = None
         mock_config.return_value = config
@@ -68,21 +75,18 @@ class TestSummarizeWithOpenAI:
     @patch("services.summarization.get_config")
     def test_summarize_with_openai_success(self, mock_config, mock_get_client):
         """Test successful OpenAI summarization."""
-        from services.summarization import _summarize_with_openai
-
         config = Mock()
         config.openai_api_key = "test-key"
         mock_config.return_value = config
 
-        # Mock OpenAI client and response
+        # Mock OpenAI client; the response is plain data
+        response = SimpleNamespace(
+            choices=[
+                SimpleNamespace(message=SimpleNamespace(content="This is the summary"))
+            ]
+        )
         mock_client = Mock()
-        mock_response = Mock()
-        mock_message = Mock()
-        mock_message.content = "This is the summary"
-        mock_choice = Mock()
-        mock_choice.message = mock_message
-        mock_response.choices = [mock_choice]
-        mock_client.create_chat_completion.return_value = mock_response
+        mock_client.create_chat_completion.return_value = response
         mock_get_client.return_value = mock_client
 
         result = _summarize_with_openai("Test transcript", "test123")
@@ -91,14 +95,14 @@ class TestSummarizeWithOpenAI:
 
         # Verify API call
         mock_client.create_chat_completion.assert_called_once()
-        call_args = mock_client.create_chat_completion.call_args
-        assert call_args[1]["temperature"] == 0.7
-        assert call_args[1]["max_tokens"] == 1200
-        assert call_args[1]["feature"] == "summarization"
-        assert call_args[1]["video_id"] == "test123"
+        _, kwargs = mock_client.create_chat_completion.call_args
+        assert kwargs["temperature"] == 0.7
+        assert kwargs["max_tokens"] == 1200
+        assert kwargs["feature"] == "summarization"
+        assert kwargs["video_id"] == "test123"
 
         # Verify messages
-        messages = call_args[1]["messages"]
+        messages = kwargs["messages"]
         assert len(messages) == 2
         assert messages[0]["role"] == "system"
         assert messages[1]["role"] == "user"
@@ -108,8 +112,6 @@ class TestSummarizeWithOpenAI:
     @patch("services.summarization.get_config")
     def test_summarize_with_openai_api_error(self, mock_config, mock_get_client):
         """Test OpenAI summarization with API error."""
-        from services.summarization import _summarize_with_openai
-
         config = Mock()
         config.openai_api_key = "test-key"
         mock_config.return_value = config
@@ -128,8 +130,6 @@ class TestSummarizeWithGemini:
     @patch("services.summarization.get_config")
     def test_summarize_with_gemini_no_api_key(self, mock_config):
         """Test Gemini summarization without API key."""
-        from services.summarization import _summarize_with_gemini
-
         config = Mock()
         config.gemini_api_key = None
         mock_config.return_value = config
@@ -141,17 +141,15 @@ class TestSummarizeWithGemini:
     @patch("services.summarization.get_config")
     def test_summarize_with_gemini_success(self, mock_config, mock_get_client):
         """Test successful Gemini summarization."""
-        from services.summarization import _summarize_with_gemini
-
         config = Mock()
         config.gemini_api_key = "test-key"
         mock_config.return_value = config
 
-        # Mock Gemini client and response
+        # Mock Gemini client; the response is plain data
         mock_client = Mock()
-        mock_response = Mock()
-        mock_response.text = "This is the Gemini summary"
-        mock_client.generate_content.return_value = mock_response
+        mock_client.generate_content.return_value = SimpleNamespace(
+            text="This is the Gemini summary"
+        )
         mock_get_client.return_value = mock_client
 
         result = _summarize_with_gemini("Test transcript", "test123")
@@ -160,17 +158,15 @@ class TestSummarizeWithGemini:
 
         # Verify API call
         mock_client.generate_content.assert_called_once()
-        call_args = mock_client.generate_content.call_args
-        assert call_args[1]["feature"] == "summarization"
-        assert call_args[1]["video_id"] == "test123"
-        assert "Test transcript" in call_args[1]["prompt"]
+        _, kwargs = mock_client.generate_content.call_args
+        assert kwargs["feature"] == "summarization"
+        assert kwargs["video_id"] == "test123"
+        assert "Test transcript" in kwargs["prompt"]
 
     @patch("services.summarization.get_tracked_gemini_client")
     @patch("services.summarization.get_config")
     def test_summarize_with_gemini_api_error(self, mock_config, mock_get_client):
         """Test Gemini summarization with API error."""
-        from services.summarization import _summarize_with_gemini
-
         config = Mock()
         config.gemini_api_key = "test-key"
         config.openai_api_key = None
@@ -190,8 +186,6 @@ class TestSummarizeWithGemini:
         self, mock_config, mock_get_gemini_client, mock_get_openai_client
     ):
         """Test Gemini summarization falls back to OpenAI after API error."""
-        from services.summarization import _summarize_with_gemini
-
         config = Mock()
         config.gemini_api_key = "test-gemini-key"
         config.openai_api_key = "test-openai-key"
@@ -221,9 +215,8 @@ class TestSummaryPrompt:
 
     def test_summary_prompt_template(self):
         """Test that prompt template contains expected elements."""
-        assert "title" in SUMMARY_PROMPT_TEMPLATE.lower()
-        assert "overview" in SUMMARY_PROMPT_TEMPLATE.lower()
-        assert "key points" in SUMMARY_PROMPT_TEMPLATE.lower()
+        for section in ("title", "overview", "key points"):
+            assert section in _LOWER_PROMPT
         assert "{transcript}" in SUMMARY_PROMPT_TEMPLATE
 
     def test_summary_prompt_formatting(self):
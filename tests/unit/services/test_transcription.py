@@ -3,11 +3,27 @@
 from unittest.mock import Mock, patch, mock_open
 import pytest
 from services.transcription import (
+    RETRY_MAX_DELAY_SECONDS,
+    _retry_delay,
     compress_audio_for_whisper,
     transcribe_audio,
 )
 
 
+class TestRetryDelay:
+    """Tests for the jittered retry backoff."""
+
+    def test_delay_is_exponential_with_jitter(self):
+        """Delay should be 2**attempt plus up to one second of jitter."""
+        for attempt in range(3):
+            delay = _retry_delay(attempt)
+            assert 2**attempt <= delay <= 2**attempt + 1
+
+    def test_delay_is_capped(self):
+        """Delay should never exceed the configured maximum."""
+        assert _retry_delay(10) == RETRY_MAX_DELAY_SECONDS
+
+
 class TestCompressAudioForWhisper:
     """Tests for compress_audio_for_whisper function."""
 
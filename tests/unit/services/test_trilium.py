@@ -1,6 +1,8 @@
 """Tests for Trilium service."""
 
-from unittest.mock import Mock, patch, mock_open
+import json
+import shutil
+from unittest.mock import Mock, patch
 import pytest
 import httpx
 from services.trilium import (
@@ -12,6 +14,7 @@ from services.trilium import (
     _markdown_to_html,
     _escape_text,
     _save_to_backup,
+    _etag_cache,
 )
 
 
@@ -38,6 +41,15 @@ class TestBuildUrl:
         url = _build_url("http://localhost:8080/", "/etapi/notes")
         assert url == "http://localhost:8080/etapi/notes"
 
+    def test_build_url_repeated_slashes(self):
+        """Test URL building collapses repeated slashes at the join."""
+        url = _build_url("http://localhost:8080//", "//etapi/notes")
+        assert url == "http://localhost:8080/etapi/notes"
+
+    def test_build_url_missing_base(self):
+        """Test URL building with no base URL configured."""
+        assert _build_url(None, "etapi/notes") == "/etapi/notes"
+
 
 class TestEscapeText:
     """Tests for HTML escaping."""
@@ -76,151 +88,132 @@ class TestEscapeText:
 class TestMarkdownToHtml:
     """Tests for markdown to HTML conversion."""
 
-    def test_markdown_h3_header(self):
-        """Test converting ### header."""
-        result = _markdown_to_html("### My Header")
-        assert "<h3>My Header</h3>" in result
-
-    def test_markdown_h2_header(self):
-        """Test converting ## header."""
-        result = _markdown_to_html("## My Header")
-        assert "<h2>My Header</h2>" in result
-
-    def test_markdown_h1_header(self):
-        """Test converting # header."""
-        result = _markdown_to_html("# My Header")
-        assert "<h1>My Header</h1>" in result
-
-    def test_markdown_bullet_dash(self):
-        """Test converting - bullet points."""
-        result = _markdown_to_html("- Item 1\n- Item 2")
-        assert "<ul>" in result
-        assert "<li>Item 1</li>" in result
-        assert "<li>Item 2</li>" in result
-        assert "</ul>" in result
-
-    def test_markdown_bullet_asterisk(self):
-        """Test converting * bullet points."""
-        result = _markdown_to_html("* Item 1\n* Item 2")
-        assert "<ul>" in result
-        assert "<li>Item 1</li>" in result
-        assert "</ul>" in result
-
-    def test_markdown_bold(self):
-        """Test converting **bold**."""
-        result = _markdown_to_html("This is **bold** text")
-        assert "<strong>bold</strong>" in result
-
-    def test_markdown_italic(self):
-        """Test converting *italic*."""
-        result = _markdown_to_html("This is *italic* text")
-        assert "<em>italic</em>" in result
-
-    def test_markdown_paragraph(self):
-        """Test converting regular paragraph."""
-        result = _markdown_to_html("Regular paragraph")
-        assert "<p>Regular paragraph</p>" in result
-
-    def test_markdown_empty_line(self):
-        """Test handling empty lines."""
-        result = _markdown_to_html("Para 1\n\nPara 2")
-        assert "<br>" in result
-
-    def test_markdown_complex(self):
-        """Test converting complex markdown."""
-        markdown = """### Summary
-
-- Point **one**
-- Point *two*
-
-Regular paragraph"""
-
+    @pytest.mark.parametrize(
+        "markdown, expected",
+        [
+            pytest.param("### My Header", ["<h3>My Header</h3>"], id="h3"),
+            pytest.param("## My Header", ["<h2>My Header</h2>"], id="h2"),
+            pytest.param("# My Header", ["<h1>My Header</h1>"], id="h1"),
+            pytest.param(
+                "- Item 1\n- Item 2",
+                ["<ul>", "<li>Item 1</li>", "<li>Item 2</li>", "</ul>"],
+                id="bullet-dash",
+            ),
+            pytest.param(
+                "* Item 1\n* Item 2",
+                ["<ul>", "<li>Item 1</li>", "</ul>"],
+                id="bullet-asterisk",
+            ),
+            pytest.param("This is **bold** text", ["<strong>bold</strong>"], id="bold"),
+            pytest.param("This is *italic* text", ["<em>italic</em>"], id="italic"),
+            pytest.param(
+                "Mix **bold** and *italic*",
+                ["<strong>bold</strong>", "<em>italic</em>"],
+                id="bold-and-italic",
+            ),
+            pytest.param(
+                "Regular paragraph", ["<p>Regular paragraph</p>"], id="paragraph"
+            ),
+            pytest.param("Para 1\n\nPara 2", ["<br>"], id="empty-line"),
+            pytest.param(
+                "### Summary\n\n- Point **one**\n- Point *two*\n\nRegular paragraph",
+                [
+                    "<h3>Summary</h3>",
+                    "<ul>",
+                    "<strong>one</strong>",
+                    "<em>two</em>",
+                    "<p>Regular paragraph</p>",
+                ],
+                id="complex",
+            ),
+            pytest.param(
+                "- Item 1\n- Item 2", ["<ul>", "</ul>"], id="list-at-end-closes"
+            ),
+        ],
+    )
+    def test_markdown_renders(self, markdown, expected):
+        """Test that each markdown construct renders to the expected HTML."""
         result = _markdown_to_html(markdown)
 
-        assert "<h3>Summary</h3>" in result
-        assert "<ul>" in result
-        assert "<strong>one</strong>" in result
-        assert "<em>two</em>" in result
-        assert "<p>Regular paragraph</p>" in result
-
-    def test_markdown_header_after_list_closes_list(self):
-        """Test that list is closed when header appears."""
-        markdown = """- Item 1
-- Item 2
-### Header"""
+        for fragment in expected:
+            assert fragment in result
+
+    def test_markdown_plain_prose(self):
+        """Test that text without markup becomes escaped paragraphs and breaks."""
+        result = _markdown_to_html("  First line \n\nSecond & <third>")
+
+        assert result == "<p>First line</p>\n<br>\n<p>Second &amp; &lt;third&gt;</p>"
+
+    @pytest.mark.parametrize(
+        "markdown, follower",
+        [
+            pytest.param("- Item 1\n- Item 2\n### Header", "<h3>", id="h3"),
+            pytest.param("- Item 1\n## Header 2", "<h2>Header 2</h2>", id="h2"),
+            pytest.param("- Item 1\n# Header 1", "<h1>Header 1</h1>", id="h1"),
+            pytest.param(
+                "- Item 1\n- Item 2\nRegular paragraph",
+                "<p>Regular paragraph</p>",
+                id="paragraph",
+            ),
+            pytest.param(
+                "- Item 1\n- Item 2\n\nNext paragraph", "<br>", id="empty-line"
+            ),
+        ],
+    )
+    def test_markdown_closes_list_before(self, markdown, follower):
+        """Test that an open list is closed before the next non-list line."""
         result = _markdown_to_html(markdown)
 
         assert "</ul>" in result
-        assert result.index("</ul>") < result.index("<h3>")
+        assert result.index("</ul>") < result.index(follower)
 
-    def test_markdown_paragraph_after_list_closes_list(self):
-        """Test that list is closed when paragraph appears."""
-        markdown = """- Item 1
-- Item 2
-Regular paragraph"""
-        result = _markdown_to_html(markdown)
+    def test_markdown_repeated_input_uses_cache(self):
+        """Test that rendering the same text twice hits the cache."""
+        _markdown_to_html.cache_clear()
 
-        assert "</ul>" in result
-        assert result.index("</ul>") < result.index("<p>Regular paragraph</p>")
+        first = _markdown_to_html("### Cached\n- Item")
+        second = _markdown_to_html("### Cached\n- Item")
 
-    def test_markdown_empty_line_closes_list(self):
-        """Test that list is closed on empty line."""
-        markdown = """- Item 1
-- Item 2
+        assert first == second
+        assert _markdown_to_html.cache_info().hits == 1
 
-Next paragraph"""
-        result = _markdown_to_html(markdown)
 
-        # List should be closed before the <br>
-        assert "</ul>" in result
+@pytest.fixture
+def trilium_mocks(monkeypatch):
+    """Configured Trilium settings and the shared HTTP client, both mocked."""
+    config = Mock(
+        trilium_url="http://localhost:8080",
+        trilium_etapi_token="test_token",
+        trilium_parent_note_id="parent123",
+    )
+    client = Mock()
+    monkeypatch.setattr("services.trilium.get_config", lambda: config)
+    monkeypatch.setattr("services.trilium.get_httpx_client", lambda: client)
+    return config, client
 
-    def test_markdown_h2_after_list(self):
-        """Test H2 header after list."""
-        markdown = """- Item 1
-## Header 2"""
-        result = _markdown_to_html(markdown)
 
-        assert "</ul>" in result
-        assert "<h2>Header 2</h2>" in result
+@pytest.fixture
+def backup_dir(tmp_path, monkeypatch):
+    """Point Trilium backups at a per-test directory."""
+    path = tmp_path / "trilium-backup"
+    monkeypatch.setattr("services.trilium._BACKUP_DIR", str(path))
+    return path
 
-    def test_markdown_h1_after_list(self):
-        """Test H1 header after list."""
-        markdown = """- Item 1
-# Header 1"""
-        result = _markdown_to_html(markdown)
-
-        assert "</ul>" in result
-        assert "<h1>Header 1</h1>" in result
 
-    def test_markdown_list_at_end_closes(self):
-        """Test that list is properly closed at end of text."""
-        markdown = """- Item 1
-- Item 2"""
-        result = _markdown_to_html(markdown)
-
-        assert "<ul>" in result
-        assert "</ul>" in result
+@pytest.fixture(autouse=True)
+def _clear_etag_cache():
+    _etag_cache.clear()
+    yield
+    _etag_cache.clear()
 
 
 class TestCheckVideoExists:
     """Tests for checking video existence in Trilium."""
 
-    @patch("services.trilium.get_config")
-    @patch("services.trilium.get_httpx_client")
-    def test_check_video_exists_found(self, mock_client_factory, mock_config):
+    def test_check_video_exists_found(self, trilium_mocks):
         """Test finding existing video note."""
-        config = Mock()
-        config.trilium_url = "http://localhost:8080"
-        config.trilium_etapi_token = "test_token"
-        mock_config.return_value = config
-
-        mock_response = Mock()
-        mock_response.json.return_value = [{"noteId": "note123"}]
-        mock_response.raise_for_status = Mock()
-
-        mock_client = Mock()
-        mock_client.get.return_value = mock_response
-        mock_client_factory.return_value = mock_client
+        _, client = trilium_mocks
+        client.get.return_value.json.return_value = [{"noteId": "note123"}]
 
         result = check_video_exists("video123")
 
@@ -228,258 +221,189 @@ class TestCheckVideoExists:
         assert result["noteId"] == "note123"
         assert "note123" in result["url"]
 
-    @patch("services.trilium.get_config")
-    @patch("services.trilium.get_httpx_client")
-    def test_check_video_exists_found_dict_format(
-        self, mock_client_factory, mock_config
-    ):
+    def test_check_video_exists_found_dict_format(self, trilium_mocks):
         """Test finding existing video note with dict response."""
-        config = Mock()
-        config.trilium_url = "http://localhost:8080"
-        config.trilium_etapi_token = "test_token"
-        mock_config.return_value = config
-
-        mock_response = Mock()
-        mock_response.json.return_value = {"results": [{"noteId": "note123"}]}
-        mock_response.raise_for_status = Mock()
-
-        mock_client = Mock()
-        mock_client.get.return_value = mock_response
-        mock_client_factory.return_value = mock_client
+        _, client = trilium_mocks
+        client.get.return_value.json.return_value = {"results": [{"noteId": "note123"}]}
 
         result = check_video_exists("video123")
 
         assert result is not None
         assert result["noteId"] == "note123"
 
-    @patch("services.trilium.get_config")
-    @patch("services.trilium.get_httpx_client")
-    def test_check_video_exists_not_found(self, mock_client_factory, mock_config):
+    def test_check_video_exists_not_found(self, trilium_mocks):
         """Test when video note doesn't exist."""
-        config = Mock()
-        config.trilium_url = "http://localhost:8080"
-        config.trilium_etapi_token = "test_token"
-        mock_config.return_value = config
+        _, client = trilium_mocks
+        client.get.return_value.json.return_value = []
 
-        mock_response = Mock()
-        mock_response.json.return_value = []
-        mock_response.raise_for_status = Mock()
-
-        mock_client = Mock()
-        mock_client.get.return_value = mock_response
-        mock_client_factory.return_value = mock_client
-
-        result = check_video_exists("video123")
+        assert check_video_exists("video123") is None
 
-        assert result is None
-
-    @patch("services.trilium.get_config")
-    def test_check_video_exists_not_configured(self, mock_config):
+    def test_check_video_exists_not_configured(self, trilium_mocks):
         """Test when Trilium is not configured."""
-        config = Mock()
+        config, client = trilium_mocks
         config.trilium_url = None
-        config.trilium_etapi_token = "test_token"
-        mock_config.return_value = config
-
-        result = check_video_exists("video123")
 
-        assert result is None
+        assert check_video_exists("video123") is None
+        client.get.assert_not_called()
 
-    @patch("services.trilium.get_config")
-    @patch("services.trilium.get_httpx_client")
-    def test_check_video_exists_http_error(self, mock_client_factory, mock_config):
+    def test_check_video_exists_http_error(self, trilium_mocks):
         """Test handling HTTP error."""
-        config = Mock()
-        config.trilium_url = "http://localhost:8080"
-        config.trilium_etapi_token = "test_token"
-        mock_config.return_value = config
+        _, client = trilium_mocks
+        client.get.side_effect = httpx.HTTPError("Connection failed")
 
-        mock_client = Mock()
-        mock_client.get.side_effect = httpx.HTTPError("Connection failed")
-        mock_client_factory.return_value = mock_client
-
-        result = check_video_exists("video123")
-
-        assert result is None
+        assert check_video_exists("video123") is None
 
-    @patch("services.trilium.get_config")
-    @patch("services.trilium.get_httpx_client")
-    def test_check_video_exists_no_note_id_in_result(
-        self, mock_client_factory, mock_config
-    ):
+    def test_check_video_exists_no_note_id_in_result(self, trilium_mocks):
         """Test handling response without noteId."""
-        config = Mock()
-        config.trilium_url = "http://localhost:8080"
-        config.trilium_etapi_token = "test_token"
-        mock_config.return_value = config
+        _, client = trilium_mocks
+        client.get.return_value.json.return_value = [{"title": "Some Note"}]
 
-        mock_response = Mock()
-        mock_response.json.return_value = [{"title": "Some Note"}]
-        mock_response.raise_for_status = Mock()
-
-        mock_client = Mock()
-        mock_client.get.return_value = mock_response
-        mock_client_factory.return_value = mock_client
+        assert check_video_exists("video123") is None
 
+    def test_check_video_exists_unexpected_response_format(self, trilium_mocks):
+        """Test handling unexpected response format (neither list nor dict with results)."""
+        _, client = trilium_mocks
+        # Return something unexpected like a string
+        client.get.return_value.json.return_value = "unexpected format"
+
+        assert check_video_exists("video123") is None
+
+    def test_check_video_exists_reuses_result_on_not_modified(self, trilium_mocks):
+        """Test that a 304 response returns the cached result without parsing."""
+        _, client = trilium_mocks
+        first_response = Mock(status_code=200, headers={"ETag": '"v1"'})
+        first_response.json.return_value = [{"noteId": "note123"}]
+        not_modified = Mock(status_code=304, headers={"ETag": '"v1"'})
+        client.get.side_effect = [first_response, not_modified]
+
+        first = check_video_exists("video123")
+        second = check_video_exists("video123")
+
+        assert second == first
+        assert second["noteId"] == "note123"
+        assert "If-None-Match" not in client.get.call_args_list[0][1]["headers"]
+        assert client.get.call_args_list[1][1]["headers"]["If-None-Match"] == '"v1"'
+        not_modified.json.assert_not_called()
+        not_modified.raise_for_status.assert_not_called()
+
+    def test_check_video_exists_refreshes_cache_on_change(self, trilium_mocks):
+        """Test that a 200 response replaces the cached ETag and result."""
+        _, client = trilium_mocks
+        empty_response = Mock(status_code=200, headers={"ETag": '"v1"'})
+        empty_response.json.return_value = []
+        found_response = Mock(status_code=200, headers={"ETag": '"v2"'})
+        found_response.json.return_value = [{"noteId": "note123"}]
+        client.get.side_effect = [empty_response, found_response]
+
+        assert check_video_exists("video123") is None
         result = check_video_exists("video123")
 
-        assert result is None
+        assert result["noteId"] == "note123"
+        assert _etag_cache["video123"] == ('"v2"', result)
 
-    @patch("services.trilium.get_config")
-    @patch("services.trilium.get_httpx_client")
-    def test_check_video_exists_unexpected_response_format(
-        self, mock_client_factory, mock_config
+    def test_check_video_exists_evicts_least_recently_used(
+        self, trilium_mocks, monkeypatch
     ):
-        """Test handling unexpected response format (neither list nor dict with results)."""
-        config = Mock()
-        config.trilium_url = "http://localhost:8080"
-        config.trilium_etapi_token = "test_token"
-        mock_config.return_value = config
+        """Test that the ETag cache keeps only the most recently used videos."""
+        monkeypatch.setattr("services.trilium.ETAG_CACHE_SIZE", 2)
+        _, client = trilium_mocks
+        client.get.return_value = Mock(status_code=200, headers={"ETag": '"v1"'})
+        client.get.return_value.json.return_value = []
 
-        mock_response = Mock()
-        # Return something unexpected like a string
-        mock_response.json.return_value = "unexpected format"
-        mock_response.raise_for_status = Mock()
-
-        mock_client = Mock()
-        mock_client.get.return_value = mock_response
-        mock_client_factory.return_value = mock_client
-
-        result = check_video_exists("video123")
+        check_video_exists("video1")
+        check_video_exists("video2")
+        client.get.return_value = Mock(status_code=304, headers={"ETag": '"v1"'})
+        check_video_exists("video1")  # Revalidated, so now most recently used
+        client.get.return_value = Mock(status_code=200, headers={"ETag": '"v1"'})
+        client.get.return_value.json.return_value = []
+        check_video_exists("video3")
 
-        assert result is None
+        assert list(_etag_cache) == ["video1", "video3"]
 
 
+@pytest.mark.usefixtures("backup_dir")
 class TestCreateTriliumNote:
     """Tests for creating Trilium notes."""
 
-    @patch("services.trilium.get_video_title_from_history")
-    @patch("services.trilium.get_config")
-    @patch("services.trilium.get_httpx_client")
-    def test_create_trilium_note_success(
-        self, mock_client_factory, mock_config, mock_get_title
-    ):
-        """Test successful note creation."""
-        config = Mock()
-        config.trilium_url = "http://localhost:8080"
-        config.trilium_etapi_token = "test_token"
-        config.trilium_parent_note_id = "parent123"
-        mock_config.return_value = config
-
-        mock_get_title.return_value = "Test Video Title"
+    @pytest.fixture
+    def video_title(self, monkeypatch):
+        """Title returned by the play history lookup (settable per test)."""
+        title = Mock(return_value="Test Video Title")
+        monkeypatch.setattr("services.trilium.get_video_title_from_history", title)
+        return title
 
+    def test_create_trilium_note_success(self, trilium_mocks, video_title):
+        """Test successful note creation."""
+        _, client = trilium_mocks
         note_response = Mock()
         note_response.json.return_value = {"note": {"noteId": "new_note123"}}
-        note_response.raise_for_status = Mock()
-
         attr_response = Mock()
         attr_response.json.return_value = {"attributeId": "attr123"}
-        attr_response.raise_for_status = Mock()
-
-        mock_client = Mock()
-        mock_client.post.side_effect = [note_response, attr_response]
-        mock_client_factory.return_value = mock_client
+        client.post.side_effect = [note_response, attr_response]
 
         result = create_trilium_note("video123", "transcript text", "summary text")
 
         assert result["noteId"] == "new_note123"
         assert "new_note123" in result["url"]
-        assert mock_client.post.call_count == 2
+        assert client.post.call_count == 2
+
+    def test_create_trilium_note_drops_cached_search(self, trilium_mocks, video_title):
+        """Test that creating a note forgets the cached "no note" search result."""
+        _, client = trilium_mocks
+        _etag_cache["video123"] = ('"v1"', None)
+        _etag_cache["other"] = ('"v1"', None)
+        note_response = Mock()
+        note_response.json.return_value = {"note": {"noteId": "new_note123"}}
+        client.post.side_effect = [note_response, Mock()]
+
+        create_trilium_note("video123", "transcript text", "summary text")
+
+        assert list(_etag_cache) == ["other"]
 
-    @patch("services.trilium.get_video_title_from_history")
-    @patch("services.trilium.get_config")
-    @patch("services.trilium.get_httpx_client")
     def test_create_trilium_note_no_title_uses_fallback(
-        self, mock_client_factory, mock_config, mock_get_title
+        self, trilium_mocks, video_title
     ):
         """Test note creation with fallback title."""
-        config = Mock()
-        config.trilium_url = "http://localhost:8080"
-        config.trilium_etapi_token = "test_token"
-        config.trilium_parent_note_id = "parent123"
-        mock_config.return_value = config
-
-        mock_get_title.return_value = None
-
+        _, client = trilium_mocks
+        video_title.return_value = None
         note_response = Mock()
         note_response.json.return_value = {"note": {"noteId": "new_note123"}}
-        note_response.raise_for_status = Mock()
-
-        attr_response = Mock()
-        attr_response.raise_for_status = Mock()
-
-        mock_client = Mock()
-        mock_client.post.side_effect = [note_response, attr_response]
-        mock_client_factory.return_value = mock_client
+        client.post.side_effect = [note_response, Mock()]
 
         create_trilium_note("video123", "transcript", "summary")
 
-        call_args = mock_client.post.call_args_list[0]
-        payload = call_args[1]["json"]
+        payload = client.post.call_args_list[0][1]["json"]
         assert "YouTube Video video123" in payload["title"]
 
-    @patch("services.trilium.get_config")
-    def test_create_trilium_note_not_configured(self, mock_config):
+    def test_create_trilium_note_not_configured(self, trilium_mocks):
         """Test note creation when not configured."""
-        config = Mock()
+        config, _ = trilium_mocks
         config.trilium_url = None
-        config.trilium_etapi_token = "test_token"
-        config.trilium_parent_note_id = "parent123"
-        mock_config.return_value = config
 
         with pytest.raises(ValueError, match="not properly configured"):
             create_trilium_note("video123", "transcript", "summary")
 
-    @patch("services.trilium.get_video_title_from_history")
-    @patch("services.trilium.get_config")
-    @patch("services.trilium.get_httpx_client")
     def test_create_trilium_note_http_error_raises_exception(
-        self, mock_client_factory, mock_config, mock_get_title
+        self, trilium_mocks, video_title, backup_dir
     ):
         """Test that HTTP errors raise exceptions."""
-        config = Mock()
-        config.trilium_url = "http://localhost:8080"
-        config.trilium_etapi_token = "test_token"
-        config.trilium_parent_note_id = "parent123"
-        mock_config.return_value = config
-
-        mock_get_title.return_value = "Test Title"
-
+        _, client = trilium_mocks
         # Simulate a status error from raise_for_status()
-        mock_response = Mock()
-        mock_response.raise_for_status.side_effect = httpx.HTTPStatusError(
+        client.post.return_value.raise_for_status.side_effect = httpx.HTTPStatusError(
             "Connection failed", request=Mock(), response=Mock()
         )
 
-        mock_client = Mock()
-        mock_client.post.return_value = mock_response
-        mock_client_factory.return_value = mock_client
-
         with pytest.raises(Exception, match="Failed to create Trilium note"):
             create_trilium_note("video123", "transcript", "summary")
 
-    @patch("services.trilium.get_video_title_from_history")
-    @patch("services.trilium.get_config")
-    @patch("services.trilium.get_httpx_client")
+        assert (backup_dir / "video123.json").exists()
+
     def test_create_trilium_note_no_note_id_in_response(
-        self, mock_client_factory, mock_config, mock_get_title
+        self, trilium_mocks, video_title
     ):
         """Test handling response without noteId."""
-        config = Mock()
-        config.trilium_url = "http://localhost:8080"
-        config.trilium_etapi_token = "test_token"
-        config.trilium_parent_note_id = "parent123"
-        mock_config.return_value = config
-
-        mock_get_title.return_value = "Test Title"
-
-        note_response = Mock()
-        note_response.json.return_value = {"note": {}}
-        note_response.raise_for_status = Mock()
-
-        mock_client = Mock()
-        mock_client.post.return_value = note_response
-        mock_client_factory.return_value = mock_client
+        _, client = trilium_mocks
+        client.post.return_value.json.return_value = {"note": {}}
 
         with pytest.raises(Exception, match="Failed to get note ID"):
             create_trilium_note("video123", "transcript", "summary")
@@ -488,67 +412,48 @@ class TestCreateTriliumNote:
 class TestGetNoteContent:
     """Tests for fetching note content."""
 
-    @patch("services.trilium.get_config")
-    @patch("services.trilium.get_httpx_client")
-    def test_get_note_content_success(self, mock_client_factory, mock_config):
+    def test_get_note_content_success(self, trilium_mocks):
         """Test successful note content fetch."""
-        config = Mock()
-        config.trilium_url = "http://localhost:8080"
-        config.trilium_etapi_token = "test_token"
-        mock_config.return_value = config
-
-        mock_response = Mock()
-        mock_response.text = "<h3>Summary</h3><p>Note content here</p>"
-        mock_response.raise_for_status = Mock()
-
-        mock_client = Mock()
-        mock_client.get.return_value = mock_response
-        mock_client_factory.return_value = mock_client
+        _, client = trilium_mocks
+        client.get.return_value.text = "<h3>Summary</h3><p>Note content here</p>"
 
         result = get_note_content("note123")
 
         assert result == "<h3>Summary</h3><p>Note content here</p>"
-        assert mock_client.get.called
+        assert client.get.called
 
-    @patch("services.trilium.get_config")
-    def test_get_note_content_not_configured(self, mock_config):
+    def test_get_note_content_not_configured(self, trilium_mocks):
         """Test when Trilium is not configured."""
-        config = Mock()
+        config, _ = trilium_mocks
         config.trilium_url = None
-        config.trilium_etapi_token = "test_token"
-        mock_config.return_value = config
-
-        result = get_note_content("note123")
 
-        assert result is None
+        assert get_note_content("note123") is None
 
-    @patch("services.trilium.get_config")
-    @patch("services.trilium.get_httpx_client")
-    def test_get_note_content_http_error(self, mock_client_factory, mock_config):
+    def test_get_note_content_http_error(self, trilium_mocks):
         """Test handling HTTP error."""
-        config = Mock()
-        config.trilium_url = "http://localhost:8080"
-        config.trilium_etapi_token = "test_token"
-        mock_config.return_value = config
+        _, client = trilium_mocks
+        client.get.side_effect = httpx.HTTPError("Connection failed")
 
-        mock_client = Mock()
-        mock_client.get.side_effect = httpx.HTTPError("Connection failed")
-        mock_client_factory.return_value = mock_client
+        assert get_note_content("note123") is None
 
-        result = get_note_content("note123")
 
-        assert result is None
+@pytest.fixture
+def audio_file(tmp_path):
+    """A small audio file on disk."""
+    path = tmp_path / "audio.mp3"
+    path.write_bytes(b"fake audio data")
+    return path
 
 
+@pytest.mark.usefixtures("backup_dir")
 class TestAttachAudioToNote:
     """Tests for attaching audio files to Trilium notes."""
 
-    @patch("builtins.open", new_callable=mock_open, read_data=b"fake audio data")
     @patch("services.trilium.get_config")
     @patch("services.trilium.get_httpx_client")
     @patch("httpx.Client")
     def test_attach_audio_success(
-        self, mock_httpx_client_class, mock_client_factory, mock_config, mock_file
+        self, mock_httpx_client_class, mock_client_factory, mock_config, audio_file
     ):
         """Test successful audio attachment."""
         config = Mock()
@@ -578,13 +483,17 @@ class TestAttachAudioToNote:
         mock_httpx_client_class.return_value = mock_upload_client
 
         result = attach_audio_to_note(
-            note_id="parent123", audio_file_path="/tmp/audio.mp3", title="audio.mp3"
+            note_id="parent123", audio_file_path=str(audio_file), title="audio.mp3"
         )
 
         assert result["noteId"] == "audio_note123"
         assert result["status"] == "success"
         assert mock_client.post.called
-        assert mock_upload_client.put.called
+
+        # The open file handle is streamed with an explicit length
+        _, put_kwargs = mock_upload_client.put.call_args
+        assert put_kwargs["content"].name == str(audio_file)
+        assert put_kwargs["headers"]["Content-Length"] == "15"
 
     @patch("services.trilium.get_config")
     def test_attach_audio_not_configured(self, mock_config):
@@ -597,11 +506,10 @@ class TestAttachAudioToNote:
         with pytest.raises(ValueError, match="not properly configured"):
             attach_audio_to_note("note123", "/tmp/audio.mp3", "audio.mp3")
 
-    @patch("builtins.open", new_callable=mock_open, read_data=b"fake audio data")
     @patch("services.trilium.get_config")
     @patch("services.trilium.get_httpx_client")
     def test_attach_audio_note_creation_fails(
-        self, mock_client_factory, mock_config, mock_file
+        self, mock_client_factory, mock_config, audio_file, backup_dir
     ):
         """Test when note creation fails."""
         config = Mock()
@@ -619,14 +527,16 @@ class TestAttachAudioToNote:
         mock_client_factory.return_value = mock_client
 
         with pytest.raises(Exception, match="Failed to get note ID"):
-            attach_audio_to_note("note123", "/tmp/audio.mp3", "audio.mp3")
+            attach_audio_to_note("note123", str(audio_file), "audio.mp3")
+
+        backup = (backup_dir / "note123_audio.txt").read_text()
+        assert f"Failed to attach: {audio_file}" in backup
 
-    @patch("builtins.open", new_callable=mock_open, read_data=b"fake audio data")
     @patch("services.trilium.get_config")
     @patch("services.trilium.get_httpx_client")
     @patch("httpx.Client")
     def test_attach_audio_upload_fails(
-        self, mock_httpx_client_class, mock_client_factory, mock_config, mock_file
+        self, mock_httpx_client_class, mock_client_factory, mock_config, audio_file
     ):
         """Test when audio upload fails."""
         config = Mock()
@@ -657,14 +567,13 @@ class TestAttachAudioToNote:
         mock_upload_client.__exit__ = Mock(return_value=None)
         mock_httpx_client_class.return_value = mock_upload_client
 
-        with pytest.raises(Exception):
-            attach_audio_to_note("note123", "/tmp/audio.mp3", "audio.mp3")
+        with pytest.raises(httpx.HTTPStatusError):
+            attach_audio_to_note("note123", str(audio_file), "audio.mp3")
 
-    @patch("builtins.open", side_effect=IOError("File read error"))
     @patch("services.trilium.get_config")
     @patch("services.trilium.get_httpx_client")
     def test_attach_audio_file_read_fails_backup_also_fails(
-        self, mock_client_factory, mock_config, mock_file
+        self, mock_client_factory, mock_config, tmp_path, monkeypatch
     ):
         """Test when audio file read fails and backup save also fails."""
         config = Mock()
@@ -681,27 +590,52 @@ class TestAttachAudioToNote:
         mock_client.post.return_value = note_response
         mock_client_factory.return_value = mock_client
 
-        # This should raise the file read exception
-        # The backup will also fail because open() is mocked to always fail
-        with pytest.raises(Exception):
-            attach_audio_to_note("note123", "/tmp/audio.mp3", "audio.mp3")
+        # A regular file where the backup directory should be makes the backup fail
+        blocker = tmp_path / "blocker"
+        blocker.write_text("")
+        monkeypatch.setattr("services.trilium._BACKUP_DIR", str(blocker / "backup"))
+
+        # The missing audio file error is raised, not the backup error
+        with pytest.raises(FileNotFoundError):
+            attach_audio_to_note("note123", str(tmp_path / "missing.mp3"), "audio.mp3")
 
 
 class TestSaveToBackup:
     """Tests for backup save function."""
 
-    @patch("builtins.open", new_callable=mock_open)
-    @patch("os.makedirs")
-    def test_save_to_backup_success(self, mock_makedirs, mock_file):
+    def test_backup_dir_recreated_after_removal(self, backup_dir):
+        """Test that a backup directory removed at runtime is created again."""
+        _save_to_backup("video1", "transcript", "summary")
+        shutil.rmtree(backup_dir)
+
+        _save_to_backup("video2", "transcript", "summary")
+
+        assert (backup_dir / "video2.json").exists()
+
+    def test_save_to_backup_success(self, backup_dir):
         """Test successful backup save."""
         _save_to_backup("video123", "transcript text", "summary text")
 
-        mock_makedirs.assert_called_once_with("/tmp/trilium-backup", exist_ok=True)
-        mock_file.assert_called_once_with("/tmp/trilium-backup/video123.json", "w")
+        data = json.loads((backup_dir / "video123.json").read_text(encoding="utf-8"))
+        assert data == {
+            "video_id": "video123",
+            "transcript": "transcript text",
+            "summary": "summary text",
+            "youtube_url": "https://www.youtube.com/watch?v=video123",
+        }
 
-    @patch("builtins.open", side_effect=Exception("Write error"))
-    @patch("os.makedirs")
-    def test_save_to_backup_fails_gracefully(self, mock_makedirs, mock_file):
+    def test_save_to_backup_keeps_utf8(self, backup_dir):
+        """Test that non-ASCII text is written as UTF-8, not escaped."""
+        _save_to_backup("video123", "café", "résumé")
+
+        raw = (backup_dir / "video123.json").read_text(encoding="utf-8")
+        assert "café" in raw
+        assert "résumé" in raw
+
+    def test_save_to_backup_fails_gracefully(self, backup_dir):
         """Test that backup failure doesn't raise exception."""
+        # A regular file in place of the directory makes the write fail
+        backup_dir.write_text("")
+
         # Should not raise exception, just log error
         _save_to_backup("video123", "transcript", "summary")
@@ -2,8 +2,69 @@
 
 import json
 import subprocess
+import threading
+import time
 from unittest.mock import Mock, patch
-from services.youtube import get_video_title, extract_video_id
+
+import pytest
+
+import services.youtube
+from services.models import VideoMetadata
+from services.youtube import (
+    DEFAULT_YT_DLP_PATH,
+    METADATA_PRINT_TEMPLATE,
+    _resolve_yt_dlp_path,
+    clear_metadata_cache,
+    extract_video_id,
+    get_video_metadata,
+    get_video_title,
+    get_videos_metadata,
+)
+
+
+@pytest.fixture(autouse=True)
+def _fresh_metadata_cache():
+    clear_metadata_cache()
+    yield
+    clear_metadata_cache()
+
+
+@pytest.fixture(autouse=True)
+def oembed(monkeypatch):
+    """HTTP client for oEmbed lookups; answers 404 so yt-dlp is used unless a test says otherwise."""
+    client = Mock()
+    client.get.return_value = Mock(status_code=404)
+    monkeypatch.setattr(services.youtube, "get_httpx_client", lambda: client)
+    return client
+
+
+def _oembed_response(title, author_name="Channel"):
+    return Mock(
+        status_code=200,
+        json=Mock(return_value={"title": title, "author_name": author_name}),
+    )
+
+
+@pytest.fixture(autouse=True)
+def stored_metadata(monkeypatch):
+    """Replace the video_metadata table with a dict for each test."""
+    store = {}
+
+    def get_batch(youtube_ids):
+        return {
+            youtube_id: VideoMetadata(
+                youtube_id, fetched_at="2024-01-01", **store[youtube_id]
+            )
+            for youtube_id in youtube_ids
+            if youtube_id in store
+        }
+
+    def save(metadata_by_id):
+        store.update({k: dict(v) for k, v in metadata_by_id.items()})
+
+    monkeypatch.setattr(services.youtube, "get_video_metadata_batch", get_batch)
+    monkeypatch.setattr(services.youtube, "save_video_metadata", save)
+    return store
 
 
 class TestExtractVideoId:
@@ -45,6 +106,51 @@ class TestExtractVideoId:
         result = extract_video_id(url)
         assert result == "dQw4w9WgXcQ"
 
+    @pytest.mark.parametrize(
+        "url, expected",
+        [
+            pytest.param(
+                "https://www.youtube.com/watch?feature=share&v=dQw4w9WgXcQ",
+                "dQw4w9WgXcQ",
+                id="v-not-first",
+            ),
+            pytest.param(
+                "https://www.youtube.com/watch?list=PL1&v=&v=dQw4w9WgXcQ&t=30",
+                "dQw4w9WgXcQ",
+                id="first-non-empty-v",
+            ),
+            pytest.param(
+                "https://www.youtube.com/watch?feature=share&vv=dQw4w9WgXcQ",
+                "https://www.youtube.com/watch?feature=share&vv=dQw4w9WgXcQ",
+                id="no-v-param",
+            ),
+            pytest.param(
+                "https://www.youtube.com/watch?t=1&v=a+b",
+                "a b",
+                id="plus-in-v",
+            ),
+            pytest.param(
+                "https://www.youtube.com/watch?t=1&%76=dQw4w9WgXcQ",
+                "dQw4w9WgXcQ",
+                id="percent-encoded-query",
+            ),
+            pytest.param(
+                "https://WWW.YouTube.com/watch?v=dQw4w9WgXcQ",
+                "dQw4w9WgXcQ",
+                id="mixed-case-host",
+            ),
+            pytest.param("https://youtu.be/short", "short", id="non-standard-id"),
+            pytest.param(
+                "https://music.youtube.com/watch?v=dQw4w9WgXcQ",
+                "https://music.youtube.com/watch?v=dQw4w9WgXcQ",
+                id="unknown-host",
+            ),
+        ],
+    )
+    def test_extract_video_id_non_canonical_urls(self, url, expected):
+        """Test URLs outside the regex fast path still parse as before."""
+        assert extract_video_id(url) == expected
+
     def test_extract_video_id_invalid_returns_trimmed(self):
         """Test that invalid input returns trimmed string."""
         invalid = "not a valid id or url"
@@ -63,7 +169,7 @@ class TestGetVideoTitle:
         mock_result.returncode = 0
         mock_result.stdout = json.dumps(
             {"title": "Test Video Title", "id": "dQw4w9WgXcQ"}
-        )
+        ).encode()
         mock_run.return_value = mock_result
 
         title = get_video_title("dQw4w9WgXcQ")
@@ -72,9 +178,16 @@ class TestGetVideoTitle:
 
         # Verify subprocess was called correctly
         mock_run.assert_called_once()
-        call_args = mock_run.call_args
-        assert "--dump-json" in call_args[0][0]
-        assert "--no-playlist" in call_args[0][0]
+        args = mock_run.call_args[0][0]
+        assert args[args.index("--print") + 1] == METADATA_PRINT_TEMPLATE
+        assert "--no-playlist" in args
+        assert "youtube:player_client=android;skip=hls,dash" in args
+        assert args[args.index("--socket-timeout") + 1] == "3"
+        assert args[args.index("--extractor-retries") + 1] == "1"
+        assert mock_run.call_args[1]["timeout"] == 6
+        assert "--no-warnings" in args
+        # Output is read as bytes and decoded by json.loads
+        assert "text" not in mock_run.call_args[1]
 
     @patch("services.youtube.subprocess.run")
     def test_get_video_title_failure(self, mock_run):
@@ -82,10 +195,11 @@ class TestGetVideoTitle:
         # Mock failed yt-dlp response
         mock_result = Mock()
         mock_result.returncode = 1
-        mock_result.stdout = ""
+        mock_result.stdout = b""
+        mock_result.stderr = "ERROR: Video unavailable \u2013 private".encode()
         mock_run.return_value = mock_result
 
-        title = get_video_title("invalid_id")
+        title = get_video_title("dQw4w9WgXcQ")
 
         assert title is None
 
@@ -95,22 +209,59 @@ class TestGetVideoTitle:
         # Mock yt-dlp returning invalid JSON
         mock_result = Mock()
         mock_result.returncode = 0
-        mock_result.stdout = "not valid json"
+        mock_result.stdout = b"not valid json"
         mock_run.return_value = mock_result
 
         title = get_video_title("dQw4w9WgXcQ")
 
         assert title is None
 
+    @patch("services.youtube.subprocess.run")
+    def test_get_video_title_non_ascii(self, mock_run):
+        """Test that UTF-8 output bytes are decoded correctly."""
+        mock_run.return_value = Mock(
+            returncode=0,
+            stdout=json.dumps({"title": "Café – 東京"}, ensure_ascii=False).encode(),
+        )
+
+        assert get_video_title("dQw4w9WgXcQ") == "Café – 東京"
+
+    @patch("services.youtube.subprocess.run")
+    def test_get_video_title_invalid_utf8(self, mock_run):
+        """Test that undecodable output is treated as a parse failure."""
+        mock_run.return_value = Mock(returncode=0, stdout=b'{"title": "\xff"}')
+
+        assert get_video_title("dQw4w9WgXcQ") is None
+
     @patch("services.youtube.subprocess.run")
     def test_get_video_title_timeout(self, mock_run):
         """Test handling subprocess timeout."""
         # Mock subprocess timeout
-        mock_run.side_effect = subprocess.TimeoutExpired(cmd="yt-dlp", timeout=10)
+        mock_run.side_effect = subprocess.TimeoutExpired(cmd="yt-dlp", timeout=6)
 
         title = get_video_title("dQw4w9WgXcQ")
 
         assert title is None
+        assert mock_run.call_count == 2
+
+    @patch("services.youtube.subprocess.run")
+    def test_get_video_title_retries_after_timeout(self, mock_run):
+        """Test that a timed-out attempt is retried once with a fresh process."""
+        mock_run.side_effect = [
+            subprocess.TimeoutExpired(cmd="yt-dlp", timeout=6),
+            Mock(returncode=0, stdout=json.dumps({"title": "Second Try"}).encode()),
+        ]
+
+        assert get_video_title("dQw4w9WgXcQ") == "Second Try"
+        assert mock_run.call_count == 2
+
+    @patch("services.youtube.subprocess.run")
+    def test_get_video_title_failure_not_retried(self, mock_run):
+        """Test that a yt-dlp error (not a timeout) is not retried."""
+        mock_run.return_value = Mock(returncode=1, stdout=b"", stderr=b"ERROR")
+
+        assert get_video_title("dQw4w9WgXcQ") is None
+        assert mock_run.call_count == 1
 
     @patch("services.youtube.subprocess.run")
     def test_get_video_title_no_title_field(self, mock_run):
@@ -120,7 +271,7 @@ class TestGetVideoTitle:
         mock_result.returncode = 0
         mock_result.stdout = json.dumps(
             {"id": "dQw4w9WgXcQ", "description": "Some description"}
-        )
+        ).encode()
         mock_run.return_value = mock_result
 
         title = get_video_title("dQw4w9WgXcQ")
@@ -136,3 +287,383 @@ class TestGetVideoTitle:
         title = get_video_title("dQw4w9WgXcQ")
 
         assert title is None
+
+
+class TestInvalidVideoId:
+    """Tests for rejecting IDs that cannot be YouTube videos."""
+
+    @pytest.mark.parametrize(
+        "youtube_id",
+        ["", "short", "dQw4w9WgXcQQ", "dQw4w9WgXc ", "https://youtu.be/x"],
+        ids=["empty", "too_short", "too_long", "space", "url"],
+    )
+    @patch("services.youtube.subprocess.run")
+    def test_invalid_id_skips_lookup(self, mock_run, oembed, youtube_id):
+        """Test that no request or process is made for an invalid ID."""
+        assert get_video_title(youtube_id) is None
+        mock_run.assert_not_called()
+        oembed.get.assert_not_called()
+
+    @patch("services.youtube.subprocess.run")
+    def test_batch_drops_invalid_ids(self, mock_run, oembed):
+        """Test that a batch only looks up the valid IDs."""
+        oembed.get.return_value = _oembed_response("Valid")
+
+        result = get_videos_metadata(["dQw4w9WgXcQ", "", "not an id"])
+
+        assert list(result) == ["dQw4w9WgXcQ"]
+        assert oembed.get.call_count == 1
+        mock_run.assert_not_called()
+
+
+class TestMetadataCache:
+    """Tests for the in-memory video metadata cache."""
+
+    @staticmethod
+    def _ok(title):
+        return Mock(
+            returncode=0, stdout=json.dumps({"title": title}).encode(), stderr=b""
+        )
+
+    @patch("services.youtube.subprocess.run")
+    def test_repeated_lookup_runs_yt_dlp_once(self, mock_run):
+        """Test that a cached video does not spawn yt-dlp again."""
+        mock_run.return_value = self._ok("Cached Title")
+
+        first = get_video_metadata("vid1xxxxxxx")
+        second = get_video_metadata("vid1xxxxxxx")
+
+        assert first == second
+        assert second["title"] == "Cached Title"
+        assert mock_run.call_count == 1
+
+    @patch("services.youtube.subprocess.run")
+    def test_failures_are_not_cached(self, mock_run):
+        """Test that a failed lookup is retried on the next call."""
+        mock_run.side_effect = [
+            Mock(returncode=1, stdout=b"", stderr=b"error"),
+            self._ok("Recovered"),
+        ]
+
+        assert get_video_title("vid1xxxxxxx") is None
+        assert get_video_title("vid1xxxxxxx") == "Recovered"
+        assert mock_run.call_count == 2
+
+    @patch("services.youtube.subprocess.run")
+    def test_callers_get_a_copy(self, mock_run):
+        """Test that mutating a returned dict does not change the cache."""
+        mock_run.return_value = self._ok("Original")
+
+        get_video_metadata("vid1xxxxxxx")["title"] = "Changed"
+
+        assert get_video_metadata("vid1xxxxxxx")["title"] == "Original"
+
+    @patch("services.youtube.subprocess.run")
+    def test_least_recently_used_entry_is_evicted(self, mock_run, monkeypatch):
+        """Test that the cache stays bounded and evicts the oldest entry."""
+        monkeypatch.setattr(services.youtube, "METADATA_CACHE_SIZE", 2)
+        mock_run.return_value = self._ok("Title")
+
+        get_video_metadata("vid1xxxxxxx")
+        get_video_metadata("vid2xxxxxxx")
+        get_video_metadata("vid1xxxxxxx")  # vid1xxxxxxx becomes most recently used
+        get_video_metadata("vid3xxxxxxx")  # evicts vid2xxxxxxx
+
+        assert list(services.youtube._metadata_cache) == ["vid1xxxxxxx", "vid3xxxxxxx"]
+
+    @patch("services.youtube.subprocess.run")
+    def test_concurrent_lookups_share_one_run(self, mock_run):
+        """Test that simultaneous lookups for one video run yt-dlp once."""
+        started = threading.Event()
+        release = threading.Event()
+
+        def slow_run(*args, **kwargs):
+            started.set()
+            release.wait(timeout=5)
+            return self._ok("Shared Title")
+
+        mock_run.side_effect = slow_run
+        results = []
+
+        def lookup():
+            results.append(get_video_title("vid1xxxxxxx"))
+
+        first = threading.Thread(target=lookup)
+        first.start()
+        assert started.wait(timeout=5)
+        second = threading.Thread(target=lookup)
+        second.start()
+        time.sleep(0.05)  # let the second lookup join the in-flight one
+        release.set()
+        first.join(timeout=5)
+        second.join(timeout=5)
+
+        assert results == ["Shared Title", "Shared Title"]
+        assert mock_run.call_count == 1
+        assert services.youtube._metadata_inflight == {}
+
+    @patch("services.youtube.subprocess.run")
+    def test_waiting_on_stalled_lookup_gives_up(self, mock_run, monkeypatch):
+        """Test that a caller joining a stalled lookup returns None after the wait bound."""
+        monkeypatch.setattr(services.youtube, "METADATA_INFLIGHT_WAIT_SECONDS", 0.05)
+        started = threading.Event()
+        release = threading.Event()
+
+        def stalled_run(*args, **kwargs):
+            started.set()
+            release.wait(timeout=5)
+            return self._ok("Late Title")
+
+        mock_run.side_effect = stalled_run
+        owner_results = []
+        owner = threading.Thread(
+            target=lambda: owner_results.append(get_video_title("vid1xxxxxxx"))
+        )
+        owner.start()
+        try:
+            assert started.wait(timeout=5)
+            assert get_video_title("vid1xxxxxxx") is None
+        finally:
+            release.set()
+            owner.join(timeout=5)
+
+        assert owner_results == ["Late Title"]
+        assert mock_run.call_count == 1
+
+
+class TestGetVideosMetadata:
+    """Tests for batched metadata lookups."""
+
+    @patch("services.youtube.subprocess.run")
+    def test_single_run_for_all_videos(self, mock_run, monkeypatch):
+        """Test that all uncached videos are fetched by one yt-dlp process."""
+        monkeypatch.setattr(services.youtube, "METADATA_BATCH_WORKERS", 1)
+        mock_run.return_value = Mock(
+            returncode=1,  # one video failed under --ignore-errors
+            stdout=b"\n".join(
+                [
+                    json.dumps(
+                        {"id": "vid1xxxxxxx", "title": "One", "channel": "C1"}
+                    ).encode(),
+                    b'{"id": "vid2xxxxxxx", "title": "\xff"}',  # undecodable line is skipped
+                    json.dumps(
+                        {"id": "vid3xxxxxxx", "title": "Three", "uploader": "U3"}
+                    ).encode(),
+                ]
+            ),
+            stderr=b"ERROR: vid2xxxxxxx unavailable",
+        )
+
+        result = get_videos_metadata(
+            ["vid1xxxxxxx", "vid2xxxxxxx", "vid3xxxxxxx", "vid1xxxxxxx"]
+        )
+
+        assert mock_run.call_count == 1
+        args = mock_run.call_args[0][0]
+        assert "--ignore-errors" in args
+        assert mock_run.call_args[1]["stderr"] == subprocess.DEVNULL
+        assert [a for a in args if a.startswith("https://")] == [
+            "https://www.youtube.com/watch?v=vid1xxxxxxx",
+            "https://www.youtube.com/watch?v=vid2xxxxxxx",
+            "https://www.youtube.com/watch?v=vid3xxxxxxx",
+        ]
+        assert set(result) == {"vid1xxxxxxx", "vid3xxxxxxx"}
+        assert result["vid1xxxxxxx"]["channel"] == "C1"
+        assert result["vid3xxxxxxx"]["channel"] == "U3"
+
+    @patch("services.youtube.subprocess.run")
+    def test_batch_split_across_parallel_runs(self, mock_run, monkeypatch):
+        """Test that a batch is spread over several concurrent yt-dlp processes."""
+        monkeypatch.setattr(services.youtube, "METADATA_BATCH_WORKERS", 2)
+        all_started = threading.Barrier(2, timeout=5)
+
+        def fake_run(args, **kwargs):
+            all_started.wait()  # Deadlocks unless both chunks run at once
+            ids = [a.rsplit("=", 1)[1] for a in args if a.startswith("https://")]
+            return Mock(
+                returncode=0,
+                stdout="\n".join(
+                    json.dumps({"id": i, "title": i.upper()}) for i in ids
+                ),
+            )
+
+        mock_run.side_effect = fake_run
+
+        result = get_videos_metadata(["vid1xxxxxxx", "vid2xxxxxxx", "vid3xxxxxxx"])
+
+        assert mock_run.call_count == 2
+        chunk_sizes = sorted(
+            len([a for a in call[0][0] if a.startswith("https://")])
+            for call in mock_run.call_args_list
+        )
+        assert chunk_sizes == [1, 2]
+        assert {i: m["title"] for i, m in result.items()} == {
+            "vid1xxxxxxx": "VID1XXXXXXX",
+            "vid2xxxxxxx": "VID2XXXXXXX",
+            "vid3xxxxxxx": "VID3XXXXXXX",
+        }
+
+    @patch("services.youtube.subprocess.run")
+    def test_batch_fills_and_uses_cache(self, mock_run):
+        """Test that batched results are cached and cached videos are skipped."""
+        mock_run.return_value = Mock(
+            returncode=0, stdout=json.dumps({"id": "vid1xxxxxxx", "title": "One"})
+        )
+        get_videos_metadata(["vid1xxxxxxx"])
+
+        assert get_video_title("vid1xxxxxxx") == "One"
+        assert get_videos_metadata(["vid1xxxxxxx"])["vid1xxxxxxx"]["title"] == "One"
+        assert mock_run.call_count == 1
+
+    @patch("services.youtube.subprocess.run")
+    def test_timeout_returns_cached_only(self, mock_run):
+        """Test that a batch timeout returns what was already cached."""
+        mock_run.side_effect = subprocess.TimeoutExpired(cmd="yt-dlp", timeout=20)
+
+        assert get_videos_metadata(["vid1xxxxxxx", "vid2xxxxxxx"]) == {}
+
+
+class TestOEmbed:
+    """Tests for metadata lookups through the oEmbed endpoint."""
+
+    @patch("services.youtube.subprocess.run")
+    def test_oembed_skips_yt_dlp(self, mock_run, oembed):
+        """Test that an oEmbed answer is used without running yt-dlp."""
+        oembed.get.return_value = _oembed_response("Title", "Author")
+
+        metadata = get_video_metadata("vid1xxxxxxx")
+
+        assert metadata == {
+            "title": "Title",
+            "channel": "Author",
+            "thumbnail_url": "https://i.ytimg.com/vi/vid1xxxxxxx/hqdefault.jpg",
+        }
+        mock_run.assert_not_called()
+        _, kwargs = oembed.get.call_args
+        assert kwargs["params"]["url"] == "https://www.youtube.com/watch?v=vid1xxxxxxx"
+        assert kwargs["timeout"] == services.youtube.OEMBED_TIMEOUT_SECONDS
+
+    @pytest.mark.parametrize(
+        "response",
+        [
+            Mock(status_code=401),
+            Mock(status_code=200, json=Mock(side_effect=ValueError("not json"))),
+            Mock(status_code=200, json=Mock(return_value={"author_name": "A"})),
+        ],
+        ids=["refused", "invalid_json", "no_title"],
+    )
+    @patch("services.youtube.subprocess.run")
+    def test_falls_back_to_yt_dlp(self, mock_run, oembed, response):
+        """Test that yt-dlp is used when oEmbed cannot answer."""
+        oembed.get.return_value = response
+        mock_run.return_value = Mock(
+            returncode=0,
+            stdout=json.dumps({"id": "vid1xxxxxxx", "title": "From yt-dlp"}),
+        )
+
+        assert get_video_title("vid1xxxxxxx") == "From yt-dlp"
+
+    @patch("services.youtube.subprocess.run")
+    def test_network_error_falls_back_to_yt_dlp(self, mock_run, oembed):
+        """Test that a failed request falls back to yt-dlp."""
+        oembed.get.side_effect = Exception("connection reset")
+        mock_run.return_value = Mock(
+            returncode=0,
+            stdout=json.dumps({"id": "vid1xxxxxxx", "title": "From yt-dlp"}),
+        )
+
+        assert get_video_title("vid1xxxxxxx") == "From yt-dlp"
+
+    @patch("services.youtube.subprocess.run")
+    def test_batch_uses_yt_dlp_only_for_refused_videos(self, mock_run, oembed):
+        """Test that a batch only sends videos oEmbed refused to yt-dlp."""
+        oembed.get.side_effect = lambda url, params, timeout: (
+            _oembed_response("Public")
+            if params["url"].endswith("publicxxxxx")
+            else Mock(status_code=403)
+        )
+        mock_run.return_value = Mock(
+            returncode=0, stdout=json.dumps({"id": "privatexxxx", "title": "Private"})
+        )
+
+        result = get_videos_metadata(["publicxxxxx", "privatexxxx"])
+
+        assert {i: m["title"] for i, m in result.items()} == {
+            "publicxxxxx": "Public",
+            "privatexxxx": "Private",
+        }
+        urls = [a for a in mock_run.call_args[0][0] if a.startswith("https://")]
+        assert urls == ["https://www.youtube.com/watch?v=privatexxxx"]
+
+
+class TestStoredMetadata:
+    """Tests for metadata persisted across restarts."""
+
+    @patch("services.youtube.subprocess.run")
+    def test_fetched_metadata_is_stored(self, mock_run, stored_metadata):
+        """Test that a yt-dlp lookup is saved for the next process."""
+        mock_run.return_value = Mock(
+            returncode=0, stdout=json.dumps({"id": "vid1xxxxxxx", "title": "One"})
+        )
+
+        get_video_metadata("vid1xxxxxxx")
+
+        assert stored_metadata["vid1xxxxxxx"]["title"] == "One"
+
+    @patch("services.youtube.subprocess.run")
+    def test_stored_metadata_skips_yt_dlp(self, mock_run, stored_metadata):
+        """Test that stored metadata answers lookups after the memory cache is lost."""
+        stored_metadata["vid1xxxxxxx"] = {
+            "title": "One",
+            "channel": "C1",
+            "thumbnail_url": "https://i.ytimg.com/vi/vid1xxxxxxx/hqdefault.jpg",
+        }
+        mock_run.return_value = Mock(
+            returncode=0, stdout=json.dumps({"id": "vid2xxxxxxx", "title": "Two"})
+        )
+
+        assert get_video_title("vid1xxxxxxx") == "One"
+        result = get_videos_metadata(["vid1xxxxxxx", "vid2xxxxxxx"])
+
+        assert result["vid1xxxxxxx"]["channel"] == "C1"
+        assert result["vid2xxxxxxx"]["title"] == "Two"
+        assert mock_run.call_count == 1
+        assert (
+            "https://www.youtube.com/watch?v=vid1xxxxxxx"
+            not in mock_run.call_args[0][0]
+        )
+
+    @patch("services.youtube.subprocess.run")
+    def test_database_errors_fall_back_to_yt_dlp(self, mock_run, monkeypatch):
+        """Test that lookups still work when the database is unavailable."""
+        broken = Mock(side_effect=Exception("database is locked"))
+        monkeypatch.setattr(services.youtube, "get_video_metadata_batch", broken)
+        monkeypatch.setattr(services.youtube, "save_video_metadata", broken)
+        mock_run.return_value = Mock(
+            returncode=0, stdout=json.dumps({"id": "vid1xxxxxxx", "title": "One"})
+        )
+
+        assert get_video_title("vid1xxxxxxx") == "One"
+
+
+class TestResolveYtDlpPath:
+    """Tests for locating the yt-dlp binary."""
+
+    @patch("services.youtube.shutil.which", return_value="/usr/bin/yt-dlp")
+    @patch("services.youtube.os.path.isfile", return_value=True)
+    def test_prefers_standalone_install(self, mock_isfile, mock_which):
+        """Test that /usr/local/bin/yt-dlp wins over PATH when present."""
+        assert _resolve_yt_dlp_path() == DEFAULT_YT_DLP_PATH
+        mock_which.assert_not_called()
+
+    @patch("services.youtube.shutil.which", return_value="/usr/bin/yt-dlp")
+    @patch("services.youtube.os.path.isfile", return_value=False)
+    def test_falls_back_to_path(self, mock_isfile, mock_which):
+        """Test that the PATH lookup is used when the default is missing."""
+        assert _resolve_yt_dlp_path() == "/usr/bin/yt-dlp"
+
+    @patch("services.youtube.shutil.which", return_value=None)
+    @patch("services.youtube.os.path.isfile", return_value=False)
+    def test_missing_binary_keeps_default(self, mock_isfile, mock_which):
+        """Test that the default path is kept when yt-dlp is not installed."""
+        assert _resolve_yt_dlp_path() == DEFAULT_YT_DLP_PATH